@@ -0,0 +1,200 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import runpy
+import shutil
+import sys
+import traceback
+
+# Renders the figures of the book (and the blog posts that share its plots)
+# without opening any windows. Each figure script is run unchanged, in its own
+# process on the Agg backend, with plt.show() replaced by a function that
+# saves every open figure under the next of its output names. A figure is
+# only rendered again when its script or one of its inputs has changed.
+#
+# Usage, from the root of the repository:
+#   python books/render_figures.py [--out DIR] [--formats png,svg] [--jobs N] [--force] [names...]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SHARED_DIR = 'books/shared/ch2-linreg'
+
+# name: (script, input files or directories, output name for each plt.show() figure)
+FIGURES = {
+    'contour_plot': (SHARED_DIR + '/contour_plot.py',
+                     [SHARED_DIR + '/grid_store.py', SHARED_DIR + '/plots.py',
+                      SHARED_DIR + '/run1.npy', SHARED_DIR + '/run2.npy',
+                      SHARED_DIR + '/grid_r1', SHARED_DIR + '/grid_r2'],
+                     ['contour2_dots', 'contour1_dots']),
+    'scaling_plot': (SHARED_DIR + '/scaling_plot.py',
+                     [SHARED_DIR + '/plots.py', SHARED_DIR + '/run1.npy', SHARED_DIR + '/run2.npy'],
+                     ['scaling_plot']),
+    'make_mult_data': (SHARED_DIR + '/make_mult_data.py',
+                       [],
+                       ['linreg-multi-synthetic-2']),
+    'circles': ('public/post_assets/tda/circles.py',
+                [],
+                ['circles']),
+}
+
+DEFAULT_OUT_DIR = 'books/rendered'
+DEFAULT_FORMATS = ['png', 'svg']
+CACHE_DIR = '.render_cache'
+MANIFEST_NAME = '.render_manifest.json'
+
+
+def _hash_path(sha, path):
+    # Files are hashed by content, directories by the names and contents of their files
+    if os.path.isdir(path):
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                file_path = os.path.join(dirpath, filename)
+                sha.update(os.path.relpath(file_path, path).encode())
+                _hash_path(sha, file_path)
+    elif os.path.exists(path):
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+    else:
+        sha.update(b'<missing>')
+
+
+def figure_key(name, formats, dpi):
+    """ Hash of everything a figure's outputs depend on: its script, inputs and the render settings """
+    script, inputs, outputs = FIGURES[name]
+    sha = hashlib.sha256()
+    sha.update(json.dumps([name, outputs, formats, dpi]).encode())
+    for path in [script] + inputs:
+        sha.update(path.encode())
+        _hash_path(sha, os.path.join(ROOT, path))
+    return sha.hexdigest()
+
+
+def _output_paths(name, out_dir, formats):
+    return [os.path.join(out_dir, output + '.' + fmt) for output in FIGURES[name][2] for fmt in formats]
+
+
+def _render(job):
+    # Runs in a fresh worker process, so the chdir, sys.path and rcParams
+    # changes made by one figure script never leak into another
+    name, out_dir, formats, dpi = job
+    script, inputs, outputs = FIGURES[name]
+    script = os.path.join(ROOT, script)
+
+    written = []
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        # Without a LaTeX install, fall back to matplotlib's own mathtext for the
+        # $...$ labels of the scripts that turn on usetex
+        if shutil.which('latex') is None:
+            rc = plt.rc
+
+            def rc_without_tex(group, **kwargs):
+                if group == 'text':
+                    kwargs.pop('usetex', None)
+                if kwargs:
+                    rc(group, **kwargs)
+            plt.rc = rc_without_tex
+
+        def save_figures(*args, **kwargs):
+            for num in plt.get_fignums():
+                k = len(written) // len(formats)
+                output = outputs[k] if k < len(outputs) else '%s_%d' % (name, k + 1)
+                for fmt in formats:
+                    path = os.path.join(out_dir, output + '.' + fmt)
+                    plt.figure(num).savefig(path, dpi=dpi)
+                    written.append(path)
+            plt.close('all')
+        plt.show = save_figures
+
+        os.chdir(os.path.dirname(script))
+        sys.path.insert(0, os.path.dirname(script))
+        sys.argv = [script]
+        runpy.run_path(script, run_name='__main__')
+        # Save any figures left open by scripts that don't end with plt.show()
+        save_figures()
+    except BaseException:
+        return name, written, traceback.format_exc()
+    return name, written, None
+
+
+def render(names=None, out_dir=DEFAULT_OUT_DIR, formats=DEFAULT_FORMATS, dpi=None, jobs=None, force=False):
+    """ Renders the given figures (all by default), skipping those that are up to date
+    The others are all rendered even if some fail, and a RuntimeError then names the failures.
+    Args:
+        names: names of entries of FIGURES.
+        out_dir: directory for the rendered files, relative to the repository root.
+        formats: file formats, passed to savefig.
+        dpi: resolution of raster formats, or None for each figure's own.
+        jobs: number of worker processes, or None for one per CPU.
+        force: render even the figures that are up to date.
+    Returns:
+        Dict mapping each rendered figure name to the paths it wrote.
+    """
+    names = list(names or FIGURES)
+    out_dir = os.path.join(ROOT, out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+
+    # Share one matplotlib cache between the workers and across runs, so the
+    # font list is built once and each TeX label is only run through LaTeX the
+    # first time it appears (matplotlib keeps them in its tex.cache)
+    os.environ.setdefault('MPLCONFIGDIR', os.path.join(ROOT, CACHE_DIR, 'matplotlib'))
+    os.makedirs(os.environ['MPLCONFIGDIR'], exist_ok=True)
+
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    keys = {name: figure_key(name, formats, dpi) for name in names}
+    stale = [name for name in names
+             if force or manifest.get(name) != keys[name]
+             or not all(os.path.exists(p) for p in _output_paths(name, out_dir, formats))]
+    for name in names:
+        if name not in stale:
+            print("%s: up to date" % name)
+
+    rendered = {}
+    failed = []
+    if stale:
+        work = [(name, out_dir, formats, dpi) for name in stale]
+        # maxtasksperchild=1 gives every figure a fresh interpreter
+        with multiprocessing.Pool(jobs, maxtasksperchild=1) as pool:
+            for name, written, error in pool.imap_unordered(_render, work):
+                if error is not None:
+                    print("%s: failed\n%s" % (name, error))
+                    manifest.pop(name, None)
+                    failed.append(name)
+                    continue
+                print("%s: %s" % (name, ', '.join(os.path.relpath(p, ROOT) for p in written)))
+                manifest[name] = keys[name]
+                rendered[name] = written
+
+        with open(manifest_path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(manifest_path + '.tmp', manifest_path)
+    if failed:
+        raise RuntimeError("failed to render %s" % ', '.join(sorted(failed)))
+    return rendered
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Render the book's figures without opening windows")
+    parser.add_argument('names', nargs='*', help="figures to render (default: all of %s)" % ', '.join(FIGURES))
+    parser.add_argument('--out', default=DEFAULT_OUT_DIR, help="output directory, relative to the repository root")
+    parser.add_argument('--formats', default=','.join(DEFAULT_FORMATS), help="comma separated file formats")
+    parser.add_argument('--dpi', type=float, default=None)
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument('--force', action='store_true', help="render even the figures that are up to date")
+    args = parser.parse_args()
+
+    unknown = set(args.names) - set(FIGURES)
+    if unknown:
+        parser.error("unknown figures: %s" % ', '.join(sorted(unknown)))
+    render(args.names, args.out, args.formats.split(','), args.dpi, args.jobs, args.force)
@@ -0,0 +1,168 @@
+import numpy as np
+
+# An adaptive, quadtree sampled loss surface. Instead of evaluating the loss
+# on a uniform grid, cells are split only where bilinear interpolation of
+# their corners is a poor fit (relative to the loss there), or where they
+# contain points of an optimizer trace. The surface can then be resampled
+# onto a regular grid of any window and resolution for plt.contour.
+#
+# Sample points live on an integer lattice of (2^max_depth + 1)^2 points
+# spanning the bounds, so points shared between cells are evaluated once.
+
+
+class AdaptiveSurface(object):
+    """ A loss surface sampled on an adaptively refined quadtree
+    Attributes:
+        bounds: (a0_min, a0_max, a1_min, a1_max).
+        max_depth: depth of the finest cells.
+        samples: dict mapping lattice coordinates (i, j) to the loss there.
+        leaves: list of (depth, i, j), the leaf cells with their lower left lattice corner.
+    """
+
+    def __init__(self, bounds, max_depth, samples, leaves):
+        self.bounds = bounds
+        self.max_depth = max_depth
+        self.samples = samples
+        self.leaves = leaves
+
+    @property
+    def num_evaluations(self):
+        return len(self.samples)
+
+    def _to_params(self, ij):
+        a0_min, a0_max, a1_min, a1_max = self.bounds
+        size = 2**self.max_depth
+        ij = np.asarray(ij, dtype=np.float64).reshape(-1, 2)
+        return np.column_stack((a0_min + (a0_max - a0_min) * ij[:, 0] / size,
+                                a1_min + (a1_max - a1_min) * ij[:, 1] / size))
+
+    def _to_lattice(self, a0s, a1s):
+        a0_min, a0_max, a1_min, a1_max = self.bounds
+        size = 2**self.max_depth
+        return ((np.asarray(a0s) - a0_min) / (a0_max - a0_min) * size,
+                (np.asarray(a1s) - a1_min) / (a1_max - a1_min) * size)
+
+    @classmethod
+    def build(cls, evaluate, bounds, max_depth=10, min_depth=3, tolerance=0.02, trace=None):
+        """ Samples a surface, refining it level by level
+        Args:
+            evaluate: function mapping a K x 2 array of [a0, a1] values to K
+                losses, for example stats.batch_loss of a SufficientStats.
+            bounds: (a0_min, a0_max, a1_min, a1_max).
+            max_depth: cells are never split beyond this depth, so the finest
+                spacing is 1 / 2^max_depth of the bounds.
+            min_depth: cells are always split down to this depth.
+            tolerance: a cell is split when the loss at its center differs from
+                the mean of its corners by more than tolerance times the loss there.
+            trace: optional T x 2 array of [a0, a1] points, such as run1.npy[:, 0:2].
+                Cells containing trace points are split down to max_depth.
+        Returns:
+            The AdaptiveSurface.
+        """
+        surface = cls(tuple(bounds), max_depth, {}, [])
+
+        def evaluate_missing(points):
+            missing = sorted(set(points) - set(surface.samples))
+            if missing:
+                values = evaluate(surface._to_params(missing))
+                surface.samples.update(zip(missing, values))
+
+        trace_cells = None
+        if trace is not None:
+            u, v = surface._to_lattice(np.asarray(trace)[:, 0], np.asarray(trace)[:, 1])
+            inside = (u >= 0) & (u <= 2**max_depth) & (v >= 0) & (v <= 2**max_depth)
+            trace_cells = np.column_stack((u[inside], v[inside])).astype(np.int64)
+
+        cells = [(0, 0)]
+        for depth in range(max_depth + 1):
+            if not cells:
+                break
+            s = 2**(max_depth - depth)
+            h = s // 2
+
+            corners = [(i + di, j + dj) for i, j in cells for di in (0, s) for dj in (0, s)]
+            evaluate_missing(corners)
+            if depth == max_depth:
+                surface.leaves.extend((depth, i, j) for i, j in cells)
+                break
+            evaluate_missing([(i + h, j + h) for i, j in cells])
+
+            if trace_cells is not None:
+                on_trace = set(map(tuple, np.minimum(trace_cells // s, 2**depth - 1) * s))
+            else:
+                on_trace = set()
+
+            next_cells = []
+            for i, j in cells:
+                corner_mean = 0.25 * sum(surface.samples[(i + di, j + dj)] for di in (0, s) for dj in (0, s))
+                center = surface.samples[(i + h, j + h)]
+                split = (depth < min_depth
+                         or abs(center - corner_mean) > tolerance * abs(center)
+                         or (i, j) in on_trace)
+                if split:
+                    next_cells.extend([(i, j), (i + h, j), (i, j + h), (i + h, j + h)])
+                else:
+                    surface.leaves.append((depth, i, j))
+            cells = next_cells
+
+        return surface
+
+    def points(self):
+        """ Returns all samples as arrays (a0s, a1s, losses), for plt.tricontour """
+        ij = sorted(self.samples)
+        params = self._to_params(ij)
+        return params[:, 0], params[:, 1], np.array([self.samples[p] for p in ij])
+
+    def resample(self, a0s, a1s):
+        """ Interpolates the surface onto the grid a0s x a1s
+        Each point is bilinearly interpolated from the corners of the leaf cell
+        containing it, so the result is as sharp as the sampling there.
+        Returns:
+            Array of shape (len(a1s), len(a0s)), in the orientation plt.contour expects.
+        """
+        D = self.max_depth
+        size = 2**D
+        U, V = np.meshgrid(*self._to_lattice(a0s, a1s), indexing='xy')
+        U = np.clip(U, 0, size)
+        V = np.clip(V, 0, size)
+        cell_u = np.minimum(U.astype(np.int64), size - 1)
+        cell_v = np.minimum(V.astype(np.int64), size - 1)
+
+        # Find the depth of the leaf containing each point, one level at a time
+        leaf_keys = np.sort(np.array([(d << 2 * D + 2) | (i << D + 1) | j for d, i, j in self.leaves]))
+        depths = np.full(U.shape, -1)
+        for d in range(D + 1):
+            s = 2**(D - d)
+            keys = (d << 2 * D + 2) | (cell_u // s * s << D + 1) | (cell_v // s * s)
+            pos = np.minimum(np.searchsorted(leaf_keys, keys), len(leaf_keys) - 1)
+            depths[(depths < 0) & (leaf_keys[pos] == keys)] = d
+
+        s = 2**(D - depths)
+        i0 = cell_u // s * s
+        j0 = cell_v // s * s
+        fu = (U - i0) / s
+        fv = (V - j0) / s
+
+        sample_keys = np.array(sorted(self.samples))
+        sample_index = sample_keys[:, 0] * (size + 1) + sample_keys[:, 1]
+        sample_values = np.array([self.samples[tuple(p)] for p in sample_keys])
+
+        def value_at(i, j):
+            return sample_values[np.searchsorted(sample_index, i * (size + 1) + j)]
+
+        return ((1 - fu) * (1 - fv) * value_at(i0, j0) + fu * (1 - fv) * value_at(i0 + s, j0)
+                + (1 - fu) * fv * value_at(i0, j0 + s) + fu * fv * value_at(i0 + s, j0 + s))
+
+    def save(self, path):
+        """ Saves the surface to an .npz file """
+        ij = np.array(sorted(self.samples), dtype=np.int64)
+        np.savez(path, bounds=np.array(self.bounds), max_depth=self.max_depth, sample_ij=ij,
+                 sample_values=np.array([self.samples[tuple(p)] for p in ij]),
+                 leaves=np.array(self.leaves, dtype=np.int64))
+
+    @classmethod
+    def load(cls, path):
+        """ Loads a surface saved with save """
+        f = np.load(path)
+        samples = dict(zip(map(tuple, f['sample_ij'].tolist()), f['sample_values']))
+        return cls(tuple(f['bounds']), int(f['max_depth']), samples, list(map(tuple, f['leaves'].tolist())))
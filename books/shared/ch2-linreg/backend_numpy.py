@@ -0,0 +1,43 @@
+import numpy as np
+
+
+class GradientDescentTrainer(object):
+    """ Full batch gradient descent on y = A x + b, with NumPy
+    Args:
+        X_data: n x m array of inputs.
+        y_data: 1 x m array of outputs.
+        learning_rate: the step size.
+        A_init: initial 1 x n value of A, zeros by default.
+        b_init: initial value of b.
+        train_b: if False, b is held at b_init.
+        reduction: 'mean' or 'sum' of the squared errors.
+        dtype: the dtype the data and parameters are stored as.
+    """
+
+    def __init__(self, X_data, y_data, learning_rate, A_init=None, b_init=0.0, train_b=True, reduction='mean',
+                 dtype=np.float32):
+        if reduction not in ('mean', 'sum'):
+            raise ValueError("unknown reduction %r" % reduction)
+        self.x = np.ascontiguousarray(X_data, dtype=dtype)
+        self.y = np.ascontiguousarray(y_data, dtype=dtype).reshape(1, -1)
+        n, m = self.x.shape
+        self.A = np.zeros((1, n), dtype=dtype) if A_init is None else np.array(A_init, dtype=dtype).reshape(1, n)
+        self.b = dtype(b_init)
+        self.learning_rate = learning_rate
+        self.train_b = train_b
+        self.scale = 1.0 / m if reduction == 'mean' else 1.0
+
+    def run(self, num_steps):
+        """ Runs num_steps steps, returning the loss computed by the last one (before its update) """
+        loss = np.nan
+        for _ in range(num_steps):
+            r = self.A.dot(self.x) + self.b - self.y
+            loss = self.scale * r.dot(r.T)[0, 0]
+            self.A -= self.learning_rate * 2 * self.scale * r.dot(self.x.T)
+            if self.train_b:
+                self.b -= self.learning_rate * 2 * self.scale * r.sum()
+        return float(loss)
+
+    def params(self):
+        """ Returns (A, b) as a 1 x n float64 array and a float """
+        return self.A.astype(np.float64), float(self.b)
@@ -0,0 +1,41 @@
+import numpy as np
+import tensorflow as tf
+import tf2_training
+
+
+class GradientDescentTrainer(object):
+    """ Full batch gradient descent on y = A x + b, with TensorFlow 2
+    Takes the same arguments as backend_numpy.GradientDescentTrainer. Steps
+    run in chunks inside one traced tf.function, see tf2_training.py.
+    """
+
+    def __init__(self, X_data, y_data, learning_rate, A_init=None, b_init=0.0, train_b=True, reduction='mean',
+                 dtype=np.float32):
+        if reduction == 'mean':
+            loss_fn = lambda y_predicted, y: tf.reduce_mean((y_predicted - y)**2)
+        elif reduction == 'sum':
+            loss_fn = tf2_training.sum_squared_error
+        else:
+            raise ValueError("unknown reduction %r" % reduction)
+        tf_dtype = tf.as_dtype(dtype)
+        x = tf.constant(np.asarray(X_data, dtype=dtype))
+        y = tf.constant(np.asarray(y_data, dtype=dtype).reshape(1, -1))
+        n = x.shape[0]
+
+        self.model = tf2_training.LinearModel(n)
+        if A_init is None:
+            A_init = np.zeros((1, n))
+        self.model.A = tf.Variable(np.reshape(A_init, (1, n)), dtype=tf_dtype, name="A")
+        # A non-trainable b is left out of model.trainable_variables, so it is held fixed
+        self.model.b = tf.Variable(b_init, dtype=tf_dtype, trainable=train_b, name="b")
+        optimizer = tf.keras.optimizers.SGD(learning_rate=learning_rate)
+        self.train_chunk = tf2_training.make_train_chunk(self.model, optimizer, x, y, loss_fn)
+
+    def run(self, num_steps):
+        """ Runs num_steps steps, returning the loss computed by the last one (before its update) """
+        # .numpy() waits for the steps to finish
+        return float(self.train_chunk(tf.constant(num_steps)).numpy())
+
+    def params(self):
+        """ Returns (A, b) as a 1 x n float64 array and a float """
+        return self.model.A.numpy().astype(np.float64), float(self.model.b.numpy())
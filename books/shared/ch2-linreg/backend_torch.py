@@ -0,0 +1,73 @@
+import numpy as np
+import torch
+
+
+class GradientDescentTrainer(object):
+    """ Full batch gradient descent on y = A x + b, with PyTorch
+    Takes the same arguments as backend_numpy.GradientDescentTrainer, and:
+        device: the torch device the data and parameters live on.
+        compile: if True, each step is a single torch.compile'd function
+            computing the loss and the closed form gradients, instead of an
+            eager forward pass followed by autograd.
+    """
+
+    def __init__(self, X_data, y_data, learning_rate, A_init=None, b_init=0.0, train_b=True, reduction='mean',
+                 dtype=np.float32, device='cpu', compile=False):
+        if reduction not in ('mean', 'sum'):
+            raise ValueError("unknown reduction %r" % reduction)
+        torch_dtype = torch.from_numpy(np.zeros(0, dtype=dtype)).dtype
+        self.device = torch.device(device)
+        self.x = torch.as_tensor(np.asarray(X_data, dtype=dtype), device=self.device)
+        self.y = torch.as_tensor(np.asarray(y_data, dtype=dtype), device=self.device).reshape(1, -1)
+        n, m = self.x.shape
+        if A_init is None:
+            A_init = np.zeros((1, n))
+        self.A = torch.tensor(np.reshape(A_init, (1, n)), dtype=torch_dtype, device=self.device, requires_grad=True)
+        self.b = torch.tensor(b_init, dtype=torch_dtype, device=self.device, requires_grad=train_b)
+        self.learning_rate = learning_rate
+        self.train_b = train_b
+        self.scale = 1.0 / m if reduction == 'mean' else 1.0
+
+        self._step = self._eager_step
+        if compile:
+            self._fused = torch.compile(self._fused_step)
+            self._step = self._compiled_step
+
+    def _eager_step(self):
+        loss = self.scale * ((self.A.mm(self.x) + self.b - self.y)**2).sum()
+        if self.train_b:
+            dA, db = torch.autograd.grad(loss, (self.A, self.b))
+        else:
+            dA, = torch.autograd.grad(loss, (self.A,))
+        with torch.no_grad():
+            self.A -= self.learning_rate * dA
+            if self.train_b:
+                self.b -= self.learning_rate * db
+        return loss
+
+    def _fused_step(self, A, b):
+        r = A.mm(self.x) + b - self.y
+        loss = self.scale * (r * r).sum()
+        A = A - self.learning_rate * 2 * self.scale * r.mm(self.x.t())
+        if self.train_b:
+            b = b - self.learning_rate * 2 * self.scale * r.sum()
+        return A, b, loss
+
+    def _compiled_step(self):
+        with torch.no_grad():
+            A, b, loss = self._fused(self.A, self.b)
+            self.A.copy_(A)
+            self.b.copy_(b)
+        return loss
+
+    def run(self, num_steps):
+        """ Runs num_steps steps, returning the loss computed by the last one (before its update) """
+        loss = torch.tensor(float('nan'))
+        for _ in range(num_steps):
+            loss = self._step()
+        # .item() waits for the device to finish
+        return loss.item()
+
+    def params(self):
+        """ Returns (A, b) as a 1 x n float64 array and a float """
+        return self.A.detach().cpu().numpy().astype(np.float64), self.b.item()
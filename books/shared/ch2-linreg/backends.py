@@ -0,0 +1,42 @@
+import importlib
+
+# The same linear regression training loop, on each framework the books use.
+# Every backend module defines a GradientDescentTrainer with the interface of
+# backend_numpy.GradientDescentTrainer. Backends are imported only when used,
+# so that PyTorch and TensorFlow stay optional.
+
+# name: (module, extra keyword arguments of its GradientDescentTrainer)
+BACKENDS = {
+    'numpy': ('backend_numpy', {}),
+    'torch': ('backend_torch', {}),
+    'torch-compiled': ('backend_torch', dict(compile=True)),
+    'tf': ('backend_tf', {}),
+}
+
+
+def make_trainer(backend, X_data, y_data, learning_rate, **kwargs):
+    """ Builds the GradientDescentTrainer of a backend
+    Args:
+        backend: a name in BACKENDS.
+        X_data, y_data, learning_rate, kwargs: passed to the trainer, see
+            backend_numpy.GradientDescentTrainer.
+    Returns:
+        The trainer.
+    """
+    if backend not in BACKENDS:
+        raise ValueError("unknown backend %r" % backend)
+    module_name, options = BACKENDS[backend]
+    module = importlib.import_module(module_name)
+    return module.GradientDescentTrainer(X_data, y_data, learning_rate, **dict(options, **kwargs))
+
+
+def available():
+    """ Names of the backends whose framework is installed """
+    names = []
+    for name, (module_name, options) in sorted(BACKENDS.items()):
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
@@ -0,0 +1,57 @@
+import numpy as np
+
+
+def train_batched(X_data, y_data, A_init, optimizer, num_iters, b_init=None, feature_scales=None, reduction='mean'):
+    """ Trains K independent linear models y = A_k x + b_k at once
+    All K parameter vectors are stacked into one K x n matrix, so each step
+    costs one matmul for the predictions and one for the gradients, whatever K is.
+    Args:
+        X_data: n x m array of inputs.
+        y_data: 1 x m array of outputs.
+        A_init: K x n array of initial values, one row per model, for example
+            random restarts.
+        optimizer: one of the optimizers.py optimizers. Its learning_rate may
+            be a K x 1 array to give every model its own learning rate.
+        num_iters: number of steps.
+        b_init: None keeps b fixed at 0 (as in scaling_temp.py), otherwise a
+            length K array of initial values for b, which is then trained.
+        feature_scales: optional K x n array. Model k sees input row i divided
+            by feature_scales[k, i], like DIV_Y in scaling_temp.py.
+        reduction: 'mean' or 'sum'.
+    Returns:
+        K x num_iters x (n+1) array. trajectories[k] has the layout of
+        run1.npy: the value of A after each step, followed by the loss before it.
+    """
+    X_data = np.asarray(X_data, dtype=np.float64)
+    y_data = np.asarray(y_data, dtype=np.float64).reshape(1, -1)
+    n, m = X_data.shape
+
+    A_init = np.atleast_2d(np.asarray(A_init, dtype=np.float64))
+    K = A_init.shape[0]
+    train_b = b_init is not None
+    theta = np.zeros((K, n + 1))
+    theta[:, :n] = A_init
+    if train_b:
+        theta[:, n] = b_init
+
+    scales = np.ones((K, n)) if feature_scales is None else np.asarray(feature_scales, dtype=np.float64)
+    denom = m if reduction == 'mean' else 1
+    if reduction not in ('mean', 'sum'):
+        raise ValueError("unknown reduction %r" % reduction)
+
+    trajectories = np.empty((K, num_iters, n + 1))
+    grad = np.zeros((K, n + 1))
+    for t in range(num_iters):
+        # Dividing the inputs by the scales is the same as dividing A by them
+        A_effective = theta[:, :n] / scales
+        residuals = A_effective.dot(X_data) + theta[:, n:] - y_data
+
+        trajectories[:, t, n] = (residuals**2).sum(axis=1) / denom
+
+        grad[:, :n] = 2 * residuals.dot(X_data.T) / scales / denom
+        if train_b:
+            grad[:, n] = 2 * residuals.sum(axis=1) / denom
+        optimizer.step(theta, grad)
+        trajectories[:, t, :n] = theta[:, :n]
+
+    return trajectories
@@ -0,0 +1,42 @@
+import time
+
+import numpy as np
+import backends
+import datasets
+
+### Benchmark settings ###
+
+# The scaled run of the feature scaling chapter (r2 in build_assets.py), the
+# same workload on every installed backend
+DIV_Y = 100
+LEARNING_RATE = 0.01
+NUM_ITERS = 5000
+NUM_WARMUP = 100 # Also covers tracing and compilation
+
+X_data, y_data = datasets.load_xy("linreg-scaling-synthetic.csv", [0, 1], 2, header=None, dtype=np.float64)
+X_data = np.array(X_data) # A copy, since the cache is read-only
+X_data[1, :] = X_data[1, :] / DIV_Y
+
+
+### Timing ###
+
+def benchmark(backend):
+    trainer = backends.make_trainer(backend, X_data, y_data, LEARNING_RATE, A_init=[1.5, 0.1 * DIV_Y], train_b=False)
+    trainer.run(NUM_WARMUP)
+
+    start = time.perf_counter()
+    final_loss = trainer.run(NUM_ITERS)
+    elapsed = time.perf_counter() - start
+
+    A, b = trainer.params()
+    print("%s: %.1f us/step, loss = %g, A = %s" % (backend, 1e6 * elapsed / NUM_ITERS, final_loss, A[0]))
+    return elapsed, A
+
+names = backends.available()
+results = {name: benchmark(name) for name in names}
+
+# Every backend should land on the same parameters, up to float32 rounding
+reference_time, reference_A = results['numpy']
+for name in names:
+    elapsed, A = results[name]
+    print("%s: %.2fx numpy, max |A - A_numpy| = %.2g" % (name, reference_time / elapsed, np.abs(A - reference_A).max()))
@@ -0,0 +1,66 @@
+import time
+
+import pandas as pd
+import torch
+import torch.optim as optim
+
+import fused_step
+
+### Benchmark settings ###
+
+NUM_ITERS = 10000
+NUM_WARMUP = 100 # Also covers the one-time torch.compile cost
+LEARNING_RATE = 0.2
+
+# Load the data
+D = pd.read_csv("homicide.csv")
+x_dataset = torch.tensor(D.age.values, dtype=torch.float)
+y_dataset = torch.tensor(D.num_homicide_deaths.values, dtype=torch.float)
+
+
+### The training steps being compared ###
+
+def make_eager_step(a, b):
+    optimizer = optim.Adam([a, b], lr=LEARNING_RATE)
+
+    def step():
+        optimizer.zero_grad()
+        current_loss = ((a * x_dataset + b - y_dataset)**2).sum()
+        current_loss.backward()
+        optimizer.step()
+        return current_loss
+    return step
+
+def make_fused_step(a, b):
+    return fused_step.LinearAdamStep(a, b, x_dataset, y_dataset, lr=LEARNING_RATE)
+
+def make_compiled_step(a, b):
+    return fused_step.LinearAdamStep(a, b, x_dataset, y_dataset, lr=LEARNING_RATE, compile=True)
+
+
+### Timing ###
+
+def benchmark(name, make_step):
+    torch.manual_seed(0)
+    a = torch.randn(1, requires_grad=True)
+    b = torch.randn(1, requires_grad=True)
+    step = make_step(a, b)
+
+    for t in range(NUM_WARMUP):
+        step()
+
+    start = time.perf_counter()
+    for t in range(NUM_ITERS):
+        current_loss = step()
+    final_loss = current_loss.item() # Waits for any outstanding work
+    elapsed = time.perf_counter() - start
+
+    print(f"{name}: {1e6 * elapsed / NUM_ITERS:.1f} us/step, loss = {final_loss}, a = {a.item()}, b = {b.item()}")
+    return elapsed
+
+eager_time = benchmark("eager", make_eager_step)
+fused_time = benchmark("fused", make_fused_step)
+print(f"fused speedup: {eager_time / fused_time:.2f}x")
+if hasattr(torch, 'compile'):
+    compiled_time = benchmark("compiled", make_compiled_step)
+    print(f"compiled speedup: {eager_time / compiled_time:.2f}x")
@@ -0,0 +1,234 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+import synth_data
+
+# Benchmarks full batch gradient descent (see backends.py) on the chapter's
+# linear regression workloads, for each backend and data size, and writes the
+# results as JSON so they can be compared across commits.
+#
+# Every (workload, backend, rows) run happens in a fresh Python process, so
+# that import times are real startup costs and peak memory is per run. For
+# each run we record:
+#
+#   import_seconds         importing the backend's framework
+#   setup_seconds          building the trainer (copying the data in)
+#   first_step_seconds     the first step, including any tracing or compiling
+#   steps_to_target,       steps and time from the start of training until the
+#   time_to_target_seconds loss gets within TARGET_GAP of the optimum (null if
+#                          it doesn't within MAX_TARGET_STEPS / TARGET_TIMEOUT)
+#   steps_per_second       throughput once warmed up
+#   peak_rss_bytes         peak resident memory of the process
+#
+# Usage:
+#   python benchmark_suite.py [--workloads ...] [--backends ...] [--rows native,1e5,1e6,1e7] [--out FILE]
+
+DEFAULT_ROWS = ['native', '1e5', '1e6', '1e7']
+DEFAULT_OUT = 'benchmark_results.json'
+SEED = 0
+
+# The loss counts as converged once it closes all but TARGET_GAP of the gap
+# between the initial loss and the optimum
+TARGET_GAP = 1e-3
+CHECK_EVERY = 50 # Steps between loss checks while chasing the target
+MAX_TARGET_STEPS = 200000
+TARGET_TIMEOUT = 30.0 # Seconds
+# Throughput is measured over about this many row-steps, and between MIN_STEPS and MAX_STEPS steps
+THROUGHPUT_WORK = 2e8
+MIN_STEPS = 10
+MAX_STEPS = 20000
+NUM_WARMUP = 5
+
+
+### Workloads ###
+
+def _bootstrap(X_data, y_data, rows, rng):
+    # Resamples the rows of a real data set to the requested size
+    if rows is None:
+        return X_data, y_data
+    index = rng.integers(0, X_data.shape[1], size=rows)
+    return X_data[:, index], y_data[:, index]
+
+
+def homicide(rows, rng):
+    """ Single variable: homicide deaths by age, from homicide.csv """
+    import datasets
+    X_data, y_data = datasets.load_xy("homicide.csv", ['age'], 'num_homicide_deaths', dtype=np.float32)
+    return _bootstrap(np.array(X_data), np.array(y_data), rows, rng)
+
+
+def multi_synthetic(rows, rng):
+    """ Two variables, y = 2 x_0 + 1.3 x_1 + 4 plus noise, as in make_mult_data.py """
+    return synth_data.generate(rows or 400, SEED, **synth_data.PRESETS['mult'])
+
+
+def scaled_synthetic(rows, rng):
+    """ The feature scaling data of make_scaling_data.py, with the second feature divided by 100 """
+    X_data, y_data = synth_data.generate(rows or 400, SEED, **synth_data.PRESETS['scaling'])
+    X_data[1] /= 100
+    return X_data, y_data
+
+
+def housing(rows, rng):
+    """ Every numeric column of housing.csv predicting median_house_value, standardized """
+    import datasets
+    data, columns = datasets.load("housing.csv", dtype=np.float32)
+    data = np.array(data)
+    data = data[:, ~np.isnan(data).any(axis=0)]
+    y_index = columns.index('median_house_value')
+    X_data = np.delete(data, y_index, axis=0)
+    X_data = (X_data - X_data.mean(axis=1, keepdims=True)) / X_data.std(axis=1, keepdims=True)
+    return _bootstrap(X_data, data[y_index:y_index + 1], rows, rng)
+
+
+WORKLOADS = {
+    'homicide': homicide,
+    'multi_synthetic': multi_synthetic,
+    'scaled_synthetic': scaled_synthetic,
+    'housing': housing,
+}
+
+
+### A single run ###
+
+def _peak_rss():
+    # ru_maxrss is in kilobytes on Linux, and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_one(workload, backend, rows):
+    """ Benchmarks one backend on one workload, see the comment at the top of the file
+    Args:
+        workload: a name in WORKLOADS.
+        backend: a name in backends.BACKENDS.
+        rows: number of data points, or None for the workload's own data set.
+    Returns:
+        Dict of the measurements.
+    """
+    import backends
+    from sufficient_stats import SufficientStats
+
+    X_data, y_data = WORKLOADS[workload](rows, np.random.default_rng(SEED))
+    n, m = X_data.shape
+
+    # The step size and target loss come from the exact quadratic (see
+    # sufficient_stats.py): 1 / L is a safe step for gradient descent, L being
+    # the largest eigenvalue of the Hessian of the mean squared error
+    stats = SufficientStats.from_data(X_data, y_data)
+    learning_rate = 1.0 / np.linalg.eigvalsh(2 * stats.G / m).max()
+    theta = np.linalg.lstsq(stats.G, stats.c, rcond=None)[0]
+    optimal_loss = stats.loss(theta[:-1].reshape(1, n), theta[-1])
+    initial_loss = stats.loss(np.zeros((1, n)), 0.0)
+    target_loss = optimal_loss + TARGET_GAP * (initial_loss - optimal_loss)
+
+    result = dict(workload=workload, backend=backend, rows=m, features=n, data_bytes=X_data.nbytes + y_data.nbytes,
+                  learning_rate=learning_rate, optimal_loss=optimal_loss, target_loss=target_loss)
+
+    module_name, _ = backends.BACKENDS[backend]
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    result['import_seconds'] = time.perf_counter() - start
+    framework = sys.modules.get({'backend_torch': 'torch', 'backend_tf': 'tensorflow'}.get(module_name, 'numpy'))
+    result['framework_version'] = getattr(framework, '__version__', None)
+
+    start = time.perf_counter()
+    trainer = backends.make_trainer(backend, X_data, y_data, learning_rate)
+    result['setup_seconds'] = time.perf_counter() - start
+
+    # Time to target, counting from the very first step
+    start = time.perf_counter()
+    loss = trainer.run(1)
+    result['first_step_seconds'] = time.perf_counter() - start
+    steps = 1
+    while loss > target_loss and steps < MAX_TARGET_STEPS and time.perf_counter() - start < TARGET_TIMEOUT:
+        loss = trainer.run(CHECK_EVERY)
+        steps += CHECK_EVERY
+    reached = loss <= target_loss
+    result['steps_to_target'] = steps if reached else None
+    result['time_to_target_seconds'] = time.perf_counter() - start if reached else None
+
+    # Throughput, on the warmed up trainer
+    trainer.run(NUM_WARMUP)
+    num_steps = int(min(max(THROUGHPUT_WORK / m, MIN_STEPS), MAX_STEPS))
+    start = time.perf_counter()
+    result['final_loss'] = trainer.run(num_steps)
+    elapsed = time.perf_counter() - start
+    result['steps_per_second'] = num_steps / elapsed
+    result['rows_per_second'] = num_steps * m / elapsed
+
+    result['peak_rss_bytes'] = _peak_rss()
+    return result
+
+
+def run_in_subprocess(workload, backend, rows):
+    """ run_one in a fresh Python process. Failures (like a missing framework) are returned as an error entry """
+    job = json.dumps(dict(workload=workload, backend=backend, rows=rows))
+    process = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', job],
+                             cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines()
+        return dict(workload=workload, backend=backend, rows=rows, error=lines[-1] if lines else 'failed')
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(workloads, backend_names, rows_list):
+    """ Runs every combination, returning the JSON document as a dict """
+    results = []
+    for workload in workloads:
+        for rows in rows_list:
+            for backend in backend_names:
+                result = run_in_subprocess(workload, backend, rows)
+                results.append(result)
+                if 'error' in result:
+                    print("%s, %s, rows = %s: %s" % (workload, backend, rows or 'native', result['error']))
+                else:
+                    if result['steps_to_target'] is None:
+                        target = "target not reached"
+                    else:
+                        target = "target in %.3g s" % result['time_to_target_seconds']
+                    print("%s, %s, rows = %d: %.0f steps/s, %s, peak %.0f MB"
+                          % (workload, backend, result['rows'], result['steps_per_second'], target,
+                             result['peak_rss_bytes'] / 2**20))
+    return dict(commit=_git_commit(), timestamp=time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                python=platform.python_version(), platform=platform.platform(), numpy=np.__version__,
+                target_gap=TARGET_GAP, results=results)
+
+
+if __name__ == '__main__':
+    import backends
+
+    parser = argparse.ArgumentParser(description="Benchmark the linear regression workloads on each backend")
+    parser.add_argument('--workloads', default=','.join(WORKLOADS), help="comma separated, from %s" % ', '.join(WORKLOADS))
+    parser.add_argument('--backends', default=','.join(sorted(backends.BACKENDS)), help="comma separated")
+    parser.add_argument('--rows', default=','.join(DEFAULT_ROWS), help="comma separated sizes, 'native' for the data set's own")
+    parser.add_argument('--out', default=DEFAULT_OUT, help="JSON file to write")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        job = json.loads(args.child)
+        print(json.dumps(run_one(job['workload'], job['backend'], job['rows'])))
+        sys.exit()
+
+    rows_list = [None if rows == 'native' else int(float(rows)) for rows in args.rows.split(',')]
+    document = run_suite(args.workloads.split(','), args.backends.split(','), rows_list)
+    with open(args.out, 'w') as f:
+        json.dump(document, f, indent=1)
+    print("Wrote %s" % args.out)
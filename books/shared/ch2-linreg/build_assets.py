@@ -0,0 +1,316 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+# A small build graph over the generated files of this chapter, shared by
+# both books: everything is computed once here, and the data files the
+# chapters link to are then copied into each book.
+#
+# Each step declares its input and output paths, the parameters it is run
+# with and an action. A step is run again only when the hash of its action's source, its
+# parameters or the contents of its inputs differ from the last build, or
+# when one of its outputs is missing or was changed by hand. Steps whose
+# inputs are ready run concurrently, each in its own process.
+#
+# Usage, from this directory:
+#   python build_assets.py [--jobs N] [--force] [--dry-run] [steps...]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STATE_PATH = '.build_state.json'
+RENDER_SCRIPT = os.path.join(HERE, os.pardir, os.pardir, 'render_figures.py')
+
+# The data files linked from the chapters of both books, and the code
+# directories they are published in
+PUBLISHED = {
+    'homicide.csv': ['../../tensorflow/src/ch2-linreg/code', '../../pytorch/src/ch2-linreg/code',
+                     '../../pytorch/src/ch2-linreg/code/single_var_reg',
+                     '../../pytorch/src/ch2-linreg/code/optimization'],
+    'linreg-scaling-synthetic.csv': ['../../tensorflow/src/ch2-linreg/code', '../../pytorch/src/ch2-linreg/code',
+                                     '../../pytorch/src/ch2-linreg/code/scaling'],
+}
+
+### Hyperparameters ###
+
+# The runs of the feature scaling chapter: r1 on the raw data, and r2 with the
+# second feature divided by 100. Their traces are saved as run1.npy and
+# run2.npy, and their loss surfaces as the grid_r1 and grid_r2 stores, each
+# sampled over the window contour_plot.py shows. Changing a run rebuilds only
+# its trace (and its grid, for div_y) and the plots that read them.
+RUNS = {
+    'r1': dict(div_y=1, learning_rate=0.0000025, num_iters=5000),
+    'r2': dict(div_y=100, learning_rate=0.01, num_iters=5000),
+}
+GRIDS = {
+    'r1': dict(a0_range=(1.4985, 1.5010), a1_range=(-0.05, 0.06), size=100),
+    'r2': dict(a0_range=(-3, 3), a1_range=(-1, 5), size=100),
+}
+
+
+### Actions ###
+
+def _load_scaled(csv_path, div_y):
+    import datasets
+    X_data, y_data = datasets.load_xy(csv_path, [0, 1], 2, header=None, dtype=np.float64)
+    X_data = np.array(X_data) # A copy, since the cache is read-only
+    X_data[1, :] = X_data[1, :] / div_y
+    return X_data, y_data
+
+
+def run_script(script):
+    """ Runs a data script as is, without opening its plot window """
+    env = dict(os.environ, MPLBACKEND='Agg')
+    subprocess.run([sys.executable, script], env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def make_grid(csv_path, store_path, div_y, a0_range, a1_range, size):
+    """ The loss surface of scaling_temp.py, into a grid store """
+    import loss_surface
+    X_data, y_data = _load_scaled(csv_path, div_y)
+    a0s = np.linspace(a0_range[0], a0_range[1], num=size)
+    a1s = np.linspace(a1_range[0], a1_range[1], num=size)
+    loss_surface.loss_grid_store(store_path, X_data, y_data, a0s, a1s, method='gram')
+
+
+def make_trace(csv_path, run_path, div_y, learning_rate, num_iters):
+    """ The gradient descent trace of scaling_temp.py, in the run1.npy layout (A after each step, the loss before it) """
+    from sufficient_stats import SufficientStats, descent_trace
+    X_data, y_data = _load_scaled(csv_path, div_y)
+    stats = SufficientStats.from_data(X_data, y_data)
+    # A learning rate that is too large overflows, and is reported as an error
+    # rather than saved as a trace of nans
+    with np.errstate(over='ignore', invalid='ignore'):
+        trace = descent_trace(stats, [1.5, 0.1 * div_y], learning_rate, num_iters, b=0.0)
+    if not np.all(np.isfinite(trace)):
+        diverged = np.argmin(np.all(np.isfinite(trace), axis=1))
+        raise ValueError("gradient descent with learning_rate=%g diverged at iteration %d" % (learning_rate, diverged))
+    np.save(run_path, trace)
+
+
+def publish(source, destinations):
+    """ Copies a data file into the code directories of the books """
+    for destination in destinations:
+        shutil.copyfile(source, destination)
+
+
+def render_figure(name):
+    """ Renders one of the figures of render_figures.py """
+    subprocess.run([sys.executable, RENDER_SCRIPT, name], check=True, stdout=subprocess.DEVNULL)
+
+
+### Steps ###
+
+class Step(object):
+    """ One node of the build graph
+    Args:
+        name: unique name of the step.
+        action: module level function, called as action(**params).
+        inputs: paths (files or directories) read by the action.
+        outputs: paths written by the action.
+        params: keyword arguments of the action.
+    """
+
+    def __init__(self, name, action, inputs, outputs, params=None):
+        self.name = name
+        self.action = action
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = params or {}
+
+    def key(self):
+        """ Hash of the action's source, the parameters and the contents of the inputs """
+        sha = hashlib.sha256()
+        sha.update(inspect.getsource(self.action).encode())
+        sha.update(json.dumps(self.params, sort_keys=True).encode())
+        for path in self.inputs:
+            sha.update(path.encode())
+            sha.update(hash_path(path).encode())
+        return sha.hexdigest()
+
+
+def hash_path(path):
+    """ sha256 of a file's contents, or of the relative names and contents of a directory's files """
+    sha = hashlib.sha256()
+    if os.path.isdir(path):
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                file_path = os.path.join(dirpath, filename)
+                sha.update(os.path.relpath(file_path, path).encode())
+                sha.update(hash_path(file_path).encode())
+    elif os.path.exists(path):
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(2**20), b''):
+                sha.update(block)
+    else:
+        return 'missing'
+    return sha.hexdigest()
+
+
+def chapter_steps():
+    """ The steps generating this chapter's data, loss surfaces, traces and plots, for both books """
+    csv_path = 'linreg-scaling-synthetic.csv'
+    grid_helpers = ['datasets.py', 'grid_store.py', 'loss_surface.py', 'sufficient_stats.py']
+    trace_helpers = ['datasets.py', 'sufficient_stats.py']
+    steps = [Step('scaling_data', run_script, ['make_scaling_data.py'], [csv_path],
+                  dict(script='make_scaling_data.py'))]
+    for run, hyperparameters in sorted(RUNS.items()):
+        store_path = 'grid_' + run
+        run_path = 'run%s.npy' % run[1:]
+        steps.append(Step('grid_' + run, make_grid, [csv_path] + grid_helpers, [store_path],
+                          dict(GRIDS[run], csv_path=csv_path, store_path=store_path, div_y=hyperparameters['div_y'])))
+        steps.append(Step('trace_' + run, make_trace, [csv_path] + trace_helpers, [run_path],
+                          dict(hyperparameters, csv_path=csv_path, run_path=run_path)))
+    for source, directories in sorted(PUBLISHED.items()):
+        destinations = [os.path.join(directory, source) for directory in directories]
+        steps.append(Step('publish_' + os.path.splitext(source)[0], publish, [source], destinations,
+                          dict(source=source, destinations=destinations)))
+    steps.append(Step('contour_plot', render_figure,
+                      ['contour_plot.py', 'plots.py', 'run1.npy', 'run2.npy', 'grid_r1', 'grid_r2'],
+                      [], dict(name='contour_plot')))
+    steps.append(Step('scaling_plot', render_figure, ['scaling_plot.py', 'plots.py', 'run1.npy', 'run2.npy'],
+                      [], dict(name='scaling_plot')))
+    return steps
+
+
+### Building ###
+
+def _run_step(step):
+    step.action(**step.params)
+    return step.name
+
+
+def build(steps, targets=None, jobs=None, force=False, dry_run=False):
+    """ Runs the steps that are out of date, and the steps depending on them
+    Args:
+        steps: list of Steps.
+        targets: names of the steps to bring up to date, with the steps they
+            depend on, or None for all of them.
+        jobs: number of worker processes, or None for one per CPU.
+        force: run every selected step, even if it is up to date.
+        dry_run: only print which steps would run. Steps depending on a stale
+            step are listed as well, although they may turn out up to date.
+    Returns:
+        List of the names of the steps that were run.
+    """
+    by_name = {step.name: step for step in steps}
+    producer = {}
+    for step in steps:
+        for path in step.outputs:
+            if path in producer:
+                raise ValueError("%r is an output of both %r and %r" % (path, producer[path], step.name))
+            producer[path] = step.name
+    deps = {step.name: {producer[p] for p in step.inputs if p in producer} for step in steps}
+
+    # Select the targets and everything they depend on
+    selected = set()
+    pending = list(targets or by_name)
+    while pending:
+        name = pending.pop()
+        if name not in by_name:
+            raise ValueError("unknown step %r" % name)
+        if name not in selected:
+            selected.add(name)
+            pending.extend(deps[name])
+
+    # Order them so that every step comes after the steps it depends on
+    order = []
+    visiting = set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError("step %r depends on itself" % name)
+        visiting.add(name)
+        for dep in sorted(deps[name]):
+            visit(dep)
+        visiting.remove(name)
+        order.append(name)
+
+    for name in sorted(selected):
+        visit(name)
+
+    state = {}
+    if os.path.exists(STATE_PATH):
+        with open(STATE_PATH) as f:
+            state = json.load(f)
+
+    def is_stale(step):
+        recorded = state.get(step.name)
+        return (force or recorded is None or recorded['key'] != step.key()
+                or any(recorded['outputs'].get(p) != hash_path(p) for p in step.outputs))
+
+    def save_state():
+        with open(STATE_PATH + '.tmp', 'w') as f:
+            json.dump(state, f, indent=1, sort_keys=True)
+        os.replace(STATE_PATH + '.tmp', STATE_PATH)
+
+    ran = []
+    done = set()
+    failed = set()
+    running = {}
+    dirty = set() # Stale steps, for a dry run
+    with ProcessPoolExecutor(jobs) as pool:
+        while len(done) + len(failed) < len(selected):
+            for name in order:
+                if name in done or name in failed or name in running.values():
+                    continue
+                if deps[name] & failed:
+                    print("%s: skipped, a step it depends on failed" % name)
+                    failed.add(name)
+                    continue
+                if not deps[name] <= done:
+                    continue
+                step = by_name[name]
+                # Inputs are only hashed once the steps producing them have run
+                if (dry_run and deps[name] & dirty) or is_stale(step):
+                    if dry_run:
+                        print("%s: would run" % name)
+                        dirty.add(name)
+                        done.add(name)
+                    else:
+                        print("%s: running" % name)
+                        running[pool.submit(_run_step, step)] = name
+                else:
+                    print("%s: up to date" % name)
+                    done.add(name)
+
+            if not running:
+                break
+
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                step = by_name[name]
+                try:
+                    future.result()
+                except Exception as e:
+                    print("%s: failed, %s: %s" % (name, type(e).__name__, e))
+                    state.pop(name, None)
+                    failed.add(name)
+                else:
+                    state[name] = dict(key=step.key(), outputs={p: hash_path(p) for p in step.outputs})
+                    done.add(name)
+                    ran.append(name)
+                save_state()
+    return ran
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Rebuild the generated files of this chapter that are out of date")
+    parser.add_argument('steps', nargs='*', help="steps to build, with their dependencies (default: all)")
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument('--force', action='store_true', help="run the steps even if they are up to date")
+    parser.add_argument('--dry-run', action='store_true', help="only list the steps that would run")
+    args = parser.parse_args()
+
+    os.chdir(HERE)
+    build(chapter_steps(), args.steps or None, args.jobs, args.force, args.dry_run)
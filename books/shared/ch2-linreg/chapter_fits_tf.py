@@ -0,0 +1,121 @@
+import numpy as np
+import tensorflow as tf
+import pandas as pd
+import least_squares
+import metrics
+import standardizer
+
+# The fits of the TensorFlow chapter scripts (single_var_reg.py,
+# multi_var_reg.py and feature_scaling.py), with the options that don't
+# belong in the code the book quotes: an exact solver to check the optimizer
+# against, the loss logged at an interval, and the feature scaling folded
+# into the parameters.
+
+### Settings ###
+
+# "single" fits homicide.csv as in single_var_reg.py, "multi" fits
+# linreg-multi-synthetic-2.csv (written by make_mult_data.py) as in
+# multi_var_reg.py, "scaling" fits linreg-scaling-synthetic.csv with feature
+# scaling as in feature_scaling.py
+WORKLOAD = "single"
+# "iterative" trains with the optimizer below, "exact" solves for A and b directly
+SOLVER = "iterative"
+# Report the loss every REPORT_EVERY iterations
+REPORT_EVERY = 100
+# For "scaling": "folded" folds the scaling into A and b, so the model runs
+# on the raw features, "cached" scales the data set once before training
+SCALING = "folded"
+
+### Load the data ###
+
+if WORKLOAD == "single":
+    D = pd.read_csv("homicide.csv")
+    X_data = np.matrix(D.age.values)
+    y_data = np.matrix(D.num_homicide_deaths.values)
+    LEARNING_RATE = 0.2
+    NUM_ITERS = 10000
+elif WORKLOAD in ("multi", "scaling"):
+    csv_path = "linreg-multi-synthetic-2.csv" if WORKLOAD == "multi" else "linreg-scaling-synthetic.csv"
+    D = np.matrix(pd.read_csv(csv_path, header=None).values)
+    X_data = D[:, 0:2].transpose()
+    y_data = D[:, 2].transpose()
+    LEARNING_RATE = 0.1
+    NUM_ITERS = 2000
+else:
+    raise ValueError("unknown WORKLOAD %r" % WORKLOAD)
+
+n = X_data.shape[0]
+
+if WORKLOAD == "scaling":
+    # The mean and standard deviation of each feature, in one pass over
+    # chunks of the data (see standardizer.py), as columns
+    scaler = standardizer.Standardizer.from_array(np.asarray(X_data))
+    means = scaler.mean.reshape(n, 1)
+    deviations = scaler.std().reshape(n, 1)
+
+### Model definition ###
+
+x = tf.placeholder(tf.float32, shape=(n, None))
+y = tf.placeholder(tf.float32, shape=(1, None))
+
+# For "scaling", A and b are the parameters of the model on the scaled features
+A = tf.get_variable("A", shape=(1, n))
+b = tf.get_variable("b", shape=())
+
+X_train = X_data
+if WORKLOAD != "scaling":
+    y_predicted = tf.matmul(A, x) + b
+elif SCALING == "folded":
+    # A (x - means) / deviations + b is A_raw x + b_raw, with the parameters
+    # below, so the graph only does the work of multi_var_reg.py
+    A_raw = A / deviations.T
+    b_raw = b - tf.matmul(A_raw, tf.constant(means, dtype=tf.float32))[0, 0]
+    y_predicted = tf.matmul(A_raw, x) + b_raw
+elif SCALING == "cached":
+    # Feed a scaled copy of the data set, computed once
+    y_predicted = tf.matmul(A, x) + b
+    X_train = (X_data - means) / deviations
+else:
+    raise ValueError("unknown SCALING %r" % SCALING)
+
+L = tf.reduce_sum((y_predicted - y)**2)
+
+### Training the model ###
+
+optimizer = tf.train.AdamOptimizer(learning_rate=LEARNING_RATE).minimize(L)
+
+session = tf.Session()
+session.run(tf.global_variables_initializer())
+
+if SOLVER == "exact":
+    # Solve the least squares problem directly, and load the result into A and b
+    X_exact = X_data if WORKLOAD != "scaling" else (X_data - means) / deviations
+    current_A, current_b, current_loss = least_squares.fit_exact(X_exact, y_data)
+    session.run([A.assign(current_A), b.assign(current_b)])
+    print("exact: loss = %g, A = %s, b = %g" % (current_loss, str(current_A), current_b))
+elif SOLVER == "iterative":
+    # Record progress every REPORT_EVERY steps, printed from a background thread
+    logger = metrics.MetricsLogger(report_every=REPORT_EVERY)
+
+    for t in range(NUM_ITERS):
+        if logger.should_log(t):
+            _, current_loss, current_A, current_b = session.run([optimizer, L, A, b], feed_dict={
+                x: X_train,
+                y: y_data
+            })
+            logger.log(t, current_loss, A=current_A, b=current_b)
+        else:
+            # Only run the update, without fetching anything back
+            session.run(optimizer, feed_dict={
+                x: X_train,
+                y: y_data
+            })
+    logger.close()
+else:
+    raise ValueError("unknown SOLVER %r" % SOLVER)
+
+if WORKLOAD == "scaling":
+    # Export the coefficients in the units of the original features
+    current_A, current_b = session.run([A, b])
+    raw_A, raw_b = scaler.fold(current_A, current_b)
+    print("original units: A = %s, b = %g" % (str(raw_A), raw_b))
@@ -0,0 +1,133 @@
+import pandas as pd
+import torch
+import torch.optim as optim
+import fused_step
+import least_squares
+import metrics
+import standardizer
+
+# The fits of the PyTorch chapter scripts (single_var_reg/single_var_reg.py,
+# multi_var_reg/multi_var_reg.py and scaling/feature_scaling.py), with the
+# options that don't belong in the code the book quotes: an exact solver to
+# check the optimizer against, the loss logged at an interval without
+# syncing every step, a fused training step, and the feature scaling folded
+# into the parameters.
+
+### Settings ###
+
+# "single" fits homicide.csv as in single_var_reg.py, "multi" fits
+# linreg-multi-synthetic-2.csv (written by make_mult_data.py) as in
+# multi_var_reg.py, "scaling" fits linreg-scaling-synthetic.csv with feature
+# scaling as in feature_scaling.py
+WORKLOAD = "single"
+# "iterative" trains with the optimizer below, "exact" solves for A and b directly
+SOLVER = "iterative"
+# Report the loss every REPORT_EVERY iterations
+REPORT_EVERY = 100
+# "eager" runs the autograd loop below, "fused" runs one hand-derived step per
+# iteration (see fused_step.py), and "compiled" also captures that step with torch.compile
+STEP = "eager"
+# For "scaling": "folded" folds the scaling into A and b, so the model runs
+# on the raw features, "cached" scales the data set once before training
+SCALING = "folded"
+
+### Load the data ###
+
+# The inputs are always n x m, so a single variable is a 1 x m x_dataset
+if WORKLOAD == "single":
+    D = pd.read_csv("homicide.csv")
+    x_dataset = torch.tensor(D.age.values, dtype=torch.float).unsqueeze(0)
+    y_dataset = torch.tensor(D.num_homicide_deaths.values, dtype=torch.float)
+    LEARNING_RATE = 0.2
+    NUM_ITERS = 10000
+elif WORKLOAD in ("multi", "scaling"):
+    csv_path = "linreg-multi-synthetic-2.csv" if WORKLOAD == "multi" else "linreg-scaling-synthetic.csv"
+    D = torch.tensor(pd.read_csv(csv_path, header=None).values, dtype=torch.float)
+    x_dataset = D[:, 0:2].t()
+    y_dataset = D[:, 2].t()
+    LEARNING_RATE = 0.1
+    NUM_ITERS = 2000
+else:
+    raise ValueError("unknown WORKLOAD %r" % WORKLOAD)
+
+n = x_dataset.shape[0]
+
+if WORKLOAD == "scaling":
+    # The mean and standard deviation of each feature, in one pass over chunks
+    # of the data (see standardizer.py). Like torch.std, use the sample
+    # standard deviation
+    scaler = standardizer.Standardizer.from_array(x_dataset.numpy())
+    means = torch.tensor(scaler.mean, dtype=torch.float).unsqueeze(1)
+    deviations = torch.tensor(scaler.std(ddof=1), dtype=torch.float).unsqueeze(1)
+
+### Model definition ###
+
+# For "scaling", A and b are the parameters of the model on the scaled features
+A = torch.randn((1, n), requires_grad=True)
+b = torch.randn(1, requires_grad=True)
+
+x_train = x_dataset
+if WORKLOAD != "scaling":
+    def model(x_input):
+        return A.mm(x_input) + b
+elif SCALING == "folded":
+    # A (x - means) / deviations + b is A_raw x + b_raw, with the parameters
+    # below, so each step only does the work of multi_var_reg.py
+    def model(x_input):
+        A_raw = A / deviations.t()
+        return A_raw.mm(x_input) + (b - A_raw.mm(means)[0])
+elif SCALING == "cached":
+    # Train on a scaled copy of the data set, computed once
+    x_train = (x_dataset - means) / deviations
+
+    def model(x_input):
+        return A.mm(x_input) + b
+else:
+    raise ValueError("unknown SCALING %r" % SCALING)
+
+def loss(y_predicted, y_target):
+    return ((y_predicted - y_target)**2).sum()
+
+### Training the model ###
+
+if SOLVER == "exact":
+    # Solve the least squares problem directly, and load the result into A and b
+    x_exact = x_dataset if WORKLOAD != "scaling" else (x_dataset - means) / deviations
+    exact_A, exact_b, exact_loss = least_squares.fit_exact(x_exact.numpy(), y_dataset.numpy())
+    with torch.no_grad():
+        A.copy_(torch.tensor(exact_A))
+        b.fill_(exact_b)
+    print(f"exact: loss = {exact_loss}, A = {A.detach().numpy()}, b = {b.item()}")
+elif SOLVER == "iterative":
+    # Record progress every REPORT_EVERY steps, printed from a background thread.
+    # Parameters are only copied on those steps, never converted with .item()
+    logger = metrics.MetricsLogger(report_every=REPORT_EVERY)
+
+    if STEP == "eager":
+        optimizer = optim.Adam([A, b], lr=LEARNING_RATE)
+    elif STEP in ("fused", "compiled"):
+        # Forward pass, loss, gradient and Adam update of A x + b in a single step
+        if WORKLOAD == "scaling" and SCALING == "folded":
+            raise ValueError("the fused step trains A x + b on x_train, use SCALING = \"cached\" with it")
+        train_step = fused_step.LinearAdamStep(A, b, x_train, y_dataset, lr=LEARNING_RATE,
+                                               compile=(STEP == "compiled"))
+    else:
+        raise ValueError("unknown STEP %r" % STEP)
+
+    for t in range(NUM_ITERS):
+        if STEP != "eager":
+            current_loss = train_step()
+        else:
+            optimizer.zero_grad()
+            current_loss = loss(model(x_train), y_dataset)
+            current_loss.backward()
+            optimizer.step()
+        logger.log(t, current_loss, A=A, b=b)
+    logger.close()
+else:
+    raise ValueError("unknown SOLVER %r" % SOLVER)
+
+if WORKLOAD == "scaling":
+    # Export the coefficients in the units of the original features
+    raw_A, raw_b = scaler.fold(A.detach().numpy(), b.item(), ddof=1)
+    print(f"original units: A = {raw_A}, b = {raw_b}")
@@ -0,0 +1,55 @@
+import hashlib
+import os
+
+import numpy as np
+import matplotlib.pyplot as plt
+import datasets
+import plots
+from adaptive_surface import AdaptiveSurface
+from sufficient_stats import SufficientStats
+
+### Hyperparameters ###
+
+BOUNDS = (-3, 3, -1, 5)
+MAX_DEPTH = 12 # Finest spacing is 1/4096 of the bounds
+TOLERANCE = 0.02
+SURFACE_NAME = 'adaptive_r1'
+
+# The same (unscaled) data and optimizer trace as the zoomed plot in contour_plot.py
+X_data, y_data = datasets.load_xy("linreg-scaling-synthetic.csv", [0, 1], 2, header=None, dtype=np.float64)
+trace = np.load('run1.npy')[:, 0:2]
+
+# The saved surface is named after everything it was sampled from, so
+# changing the data, the trace or a setting above samples a new one
+key = hashlib.sha256()
+for array in (X_data, y_data, trace, np.array(BOUNDS, dtype=np.float64), np.array([MAX_DEPTH, TOLERANCE])):
+    key.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+SURFACE_PATH = '%s_%s.npz' % (SURFACE_NAME, key.hexdigest()[:16])
+
+
+### Sampling the surface ###
+
+# Refine along the optimizer trace and wherever the loss changes quickly,
+# reusing the saved surface when there is one
+if os.path.exists(SURFACE_PATH):
+    surface = AdaptiveSurface.load(SURFACE_PATH)
+else:
+    stats = SufficientStats.from_data(X_data, y_data)
+    surface = AdaptiveSurface.build(stats.batch_loss, BOUNDS, max_depth=MAX_DEPTH, tolerance=TOLERANCE, trace=trace)
+    surface.save(SURFACE_PATH)
+print("%d loss evaluations, against %d for a uniform grid of the same resolution"
+      % (surface.num_evaluations, (2**MAX_DEPTH + 1)**2))
+
+
+### Plotting ###
+
+# Any window can be rendered from the same samples
+a0s = np.linspace(1.4985, 1.5010, 200)
+a1s = np.linspace(-0.05, 0.06, 200)
+ls = surface.resample(a0s, a1s)
+
+levels = np.linspace(8.5, 5000)
+plots.loss_contour(a0s, a1s, ls, levels, trace, (2.0, 0.013), 'Level sets of the loss function for D',
+                   (1.4985, 1.5010), (-0.05, 0.06))
+
+plt.show()
@@ -0,0 +1,30 @@
+import numpy as np
+import matplotlib.pyplot as plt
+import grid_store
+import plots
+
+# Grids are read from their memory-mapped stores, which are already in the
+# orientation plt.contour expects, so only the plotted window is loaded
+a0s, a1s, ls = grid_store.open_run('r2').window((-3, 3), (-1, 5))
+
+trace = np.load('run2.npy')[:, 0:2]
+
+levels = np.linspace(0, 1600)
+c2 = plots.loss_contour(a0s, a1s, ls, levels, trace, (2.0, 1.3), 'Level sets of the loss function for D\'',
+                        (-3, 3), (-1, 5))
+# plt.clabel(c2, inline=1, fontsize=10)
+plt.show()
+
+
+
+a0s, a1s, ls = grid_store.open_run('r1').window((1.4985, 1.5010), (-0.05, 0.06))
+
+trace = np.load('run1.npy')[:, 0:2]
+# trace = trace[0:10, :]
+
+levels = np.linspace(0, 5000)
+c1 = plots.loss_contour(a0s, a1s, ls, levels, trace, (2.0, 0.013), 'Level sets of the loss function for D',
+                        (1.4985, 1.5010), (-0.05, 0.06))
+# plt.clabel(c1, inline=1, fontsize=10)
+
+plt.show()
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Each CSV is parsed once and converted into a binary .npy file in
+# CACHE_DIR, next to the CSV. Later loads memory-map that file instead of
+# parsing the text again.
+#
+# The data is stored column by column (a k x m array for k columns), so any
+# run of adjacent columns is a contiguous, zero-copy slice with the same
+# n x m layout as X_data in the chapter scripts.
+CACHE_DIR = '.dataset_cache'
+
+
+def _file_hash(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(2**20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _cache_paths(path, dtype):
+    directory, name = os.path.split(os.path.abspath(path))
+    base = os.path.join(directory, CACHE_DIR, '%s.%s' % (name, np.dtype(dtype).name))
+    return base + '.npy', base + '.json'
+
+
+def _write_meta(json_path, meta):
+    # Through a temporary file named after the process, like the .npy below
+    tmp = json_path + '.%d.tmp' % os.getpid()
+    with open(tmp, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp, json_path)
+
+
+def _is_fresh(path, meta, json_path):
+    # A matching size and mtime is trusted, otherwise fall back to the hash,
+    # so that merely touching the CSV does not force it to be parsed again.
+    # When the hash matches, the new mtime is recorded so that the next load
+    # can trust it without hashing the file again.
+    stat = os.stat(path)
+    if stat.st_size != meta['size']:
+        return False
+    if stat.st_mtime == meta['mtime']:
+        return True
+    if _file_hash(path) != meta['sha256']:
+        return False
+    meta['mtime'] = stat.st_mtime
+    _write_meta(json_path, meta)
+    return True
+
+
+def _convert(path, header, dtype, npy_path, json_path):
+    D = pd.read_csv(path, header=header)
+    # Non-numeric columns (like ocean_proximity in housing.csv) are dropped
+    D = D.select_dtypes(include=[np.number])
+    columns = [str(c) for c in D.columns]
+    data = np.ascontiguousarray(D.values.T, dtype=dtype)
+
+    os.makedirs(os.path.dirname(npy_path), exist_ok=True)
+    # Write to temporary files first, so an interrupted conversion is never
+    # mistaken for a complete one. They are named after the process, as
+    # several processes (see sweep.py and build_assets.py) may convert the
+    # same file at once.
+    tmp = '.%d.tmp' % os.getpid()
+    np.save(npy_path + tmp + '.npy', data)
+    os.replace(npy_path + tmp + '.npy', npy_path)
+
+    stat = os.stat(path)
+    meta = dict(columns=columns, size=stat.st_size, mtime=stat.st_mtime, sha256=_file_hash(path), header=header)
+    _write_meta(json_path, meta)
+    return meta
+
+
+def load(path, header='infer', dtype=np.float32, mmap_mode='r'):
+    """ Loads the numeric columns of a CSV file, through the binary cache
+    Args:
+        path: the CSV file.
+        header: 'infer' for CSVs with a header row, None for the synthetic data sets.
+        dtype: the dtype to store and serve the data as.
+        mmap_mode: passed to np.load. 'r' gives read-only views; 'c' gives
+            copy-on-write views, which torch.from_numpy accepts without a warning.
+    Returns:
+        (data, columns): a k x m memory-mapped array with one row per column,
+        and the list of k column names (the column indices, as strings, when
+        header is None).
+    """
+    npy_path, json_path = _cache_paths(path, dtype)
+    meta = None
+    if os.path.exists(npy_path) and os.path.exists(json_path):
+        with open(json_path) as f:
+            meta = json.load(f)
+        if meta.get('header') != header or not _is_fresh(path, meta, json_path):
+            meta = None
+    if meta is None:
+        meta = _convert(path, header, dtype, npy_path, json_path)
+    return np.load(npy_path, mmap_mode=mmap_mode), meta['columns']
+
+
+def load_xy(path, x_columns, y_column, header='infer', dtype=np.float32, mmap_mode='r'):
+    """ Loads X_data (n x m) and y_data (1 x m) from a CSV file, through the binary cache
+    Columns are given by name, or by index when header is None. When
+    x_columns are adjacent and in order, X_data is a zero-copy view.
+    """
+    data, columns = load(path, header, dtype, mmap_mode)
+    indices = [columns.index(str(c)) for c in x_columns]
+    if indices == list(range(indices[0], indices[0] + len(indices))):
+        X_data = data[indices[0]:indices[0] + len(indices)]
+    else:
+        X_data = data[indices]
+    y_index = columns.index(str(y_column))
+    y_data = data[y_index:y_index + 1]
+    return X_data, y_data
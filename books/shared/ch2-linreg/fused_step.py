@@ -0,0 +1,69 @@
+import torch
+
+
+class LinearAdamStep(object):
+    """ One fused training step for the linear model and the summed squared error loss
+    The gradient of the loss of a linear model has a closed form, so instead of
+    building an autograd graph every iteration, each call computes the
+    prediction, loss, gradient and Adam update (with the same update rule as
+    optim.Adam) directly on the parameter tensors.
+    Args:
+        A, b: the trainable parameters. Either a of shape (1,) with x_dataset of
+            shape (m,) as in benchmark_step.py, or A of shape (1, n) with
+            x_dataset of shape (n, m) as in chapter_fits_torch.py.
+        x_dataset, y_dataset: the data set.
+        lr, betas, eps: the Adam hyperparameters.
+        compile: if True and torch.compile is available, the step is captured
+            and compiled once, fusing the whole step into a few kernels.
+    """
+
+    def __init__(self, A, b, x_dataset, y_dataset, lr=0.001, betas=(0.9, 0.999), eps=1e-8, compile=False):
+        self.params = [A, b]
+        self.x_dataset = x_dataset
+        self.y_dataset = y_dataset
+        self.lr = lr
+        self.beta1, self.beta2 = betas
+        self.eps = eps
+
+        self.exp_avgs = [torch.zeros_like(p) for p in self.params]
+        self.exp_avg_sqs = [torch.zeros_like(p) for p in self.params]
+        # Kept as tensors rather than a Python step count, so a compiled step
+        # is not specialized (and recompiled) for every value of t
+        self.beta1_power = torch.ones(())
+        self.beta2_power = torch.ones(())
+
+        self._step = self._fused_step
+        if compile and hasattr(torch, 'compile'):
+            self._step = torch.compile(self._fused_step)
+
+    def _gradients(self, A, b):
+        x = self.x_dataset
+        if x.dim() == 1:
+            residuals = A * x + b - self.y_dataset
+            grad_A = 2 * (residuals * x).sum()
+        else:
+            residuals = A.mm(x) + b - self.y_dataset
+            grad_A = 2 * residuals.mm(x.t())
+        grad_b = 2 * residuals.sum()
+        return (residuals**2).sum(), [grad_A.reshape(A.shape), grad_b.reshape(b.shape)]
+
+    def _fused_step(self):
+        A, b = self.params
+        loss, grads = self._gradients(A, b)
+
+        self.beta1_power.mul_(self.beta1)
+        self.beta2_power.mul_(self.beta2)
+        step_size = self.lr / (1 - self.beta1_power)
+        bias_correction2_sqrt = (1 - self.beta2_power).sqrt()
+
+        for p, grad, exp_avg, exp_avg_sq in zip(self.params, grads, self.exp_avgs, self.exp_avg_sqs):
+            exp_avg.mul_(self.beta1).add_(grad, alpha=1 - self.beta1)
+            exp_avg_sq.mul_(self.beta2).addcmul_(grad, grad, value=1 - self.beta2)
+            denom = exp_avg_sq.sqrt() / bias_correction2_sqrt + self.eps
+            p.sub_(step_size * exp_avg / denom)
+        return loss
+
+    def __call__(self):
+        """ Runs one step, returning the loss before the update (as a tensor, without syncing) """
+        with torch.no_grad():
+            return self._step()
@@ -0,0 +1,125 @@
+import json
+import os
+
+import numpy as np
+
+# A grid store is a directory holding a loss surface sampled on a grid:
+#
+#   a0s.npy, a1s.npy  the grid axes
+#   values.npy        the values, split into tile x tile chunks
+#   meta.json         the shape, tile size and dtype
+#
+# Values are kept in the orientation plt.contour expects, values[j, i] being
+# the loss at (a0s[i], a1s[j]), so no transpose (and copy) is needed to plot.
+# values.npy is memory-mapped and stored tile by tile, with shape
+# (tile rows, tile columns, tile, tile), so reading a small window of a large
+# grid only touches the tiles that overlap it. Grids smaller than a tile are
+# stored as a single tile of their own size, rather than padded.
+DEFAULT_TILE = 256
+
+
+def _tile_slices(start, stop, tile):
+    # Yields (tile index, slice within the tile, slice within the output)
+    for t in range(start // tile, (stop - 1) // tile + 1):
+        lo = max(start, t * tile)
+        hi = min(stop, (t + 1) * tile)
+        yield t, slice(lo - t * tile, hi - t * tile), slice(lo - start, hi - start)
+
+
+class GridStore(object):
+    """ A chunked, memory-mapped loss surface, see the comment at the top of grid_store.py """
+
+    def __init__(self, path, a0s, a1s, values, tile):
+        self.path = path
+        self.a0s = a0s
+        self.a1s = a1s
+        self.values = values
+        self.tile = tile
+
+    @classmethod
+    def create(cls, path, a0s, a1s, tile=DEFAULT_TILE, dtype=np.float64):
+        """ Creates an empty store, to be filled with write() """
+        a0s = np.asarray(a0s, dtype=np.float64)
+        a1s = np.asarray(a1s, dtype=np.float64)
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'a0s.npy'), a0s)
+        np.save(os.path.join(path, 'a1s.npy'), a1s)
+
+        shape = (len(a1s), len(a0s))
+        tile = max(1, min(tile, max(shape)))
+        tiles_shape = (-(-shape[0] // tile), -(-shape[1] // tile), tile, tile)
+        values = np.lib.format.open_memmap(os.path.join(path, 'values.npy'), mode='w+',
+                                           dtype=dtype, shape=tiles_shape)
+        values[...] = np.nan
+
+        meta = dict(shape=shape, tile=tile, dtype=np.dtype(dtype).name)
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        return cls(path, a0s, a1s, values, tile)
+
+    @classmethod
+    def open(cls, path, mode='r'):
+        """ Opens an existing store, memory-mapping its values """
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        a0s = np.load(os.path.join(path, 'a0s.npy'))
+        a1s = np.load(os.path.join(path, 'a1s.npy'))
+        values = np.load(os.path.join(path, 'values.npy'), mmap_mode=mode)
+        return cls(path, a0s, a1s, values, meta['tile'])
+
+    @property
+    def shape(self):
+        return (len(self.a1s), len(self.a0s))
+
+    def write(self, row, col, block):
+        """ Writes block into the values, with its top left corner at values[row, col] """
+        block = np.asarray(block)
+        for ty, tile_rows, block_rows in _tile_slices(row, row + block.shape[0], self.tile):
+            for tx, tile_cols, block_cols in _tile_slices(col, col + block.shape[1], self.tile):
+                self.values[ty, tx, tile_rows, tile_cols] = block[block_rows, block_cols]
+
+    def read(self, rows=slice(None), cols=slice(None)):
+        """ Reads values[rows, cols] (contiguous slices), touching only the overlapping tiles """
+        row_start, row_stop, _ = rows.indices(self.shape[0])
+        col_start, col_stop, _ = cols.indices(self.shape[1])
+        out = np.empty((max(row_stop - row_start, 0), max(col_stop - col_start, 0)), dtype=self.values.dtype)
+        if out.size == 0:
+            return out
+        for ty, tile_rows, out_rows in _tile_slices(row_start, row_stop, self.tile):
+            for tx, tile_cols, out_cols in _tile_slices(col_start, col_stop, self.tile):
+                out[out_rows, out_cols] = self.values[ty, tx, tile_rows, tile_cols]
+        return out
+
+    def window(self, a0_range=None, a1_range=None):
+        """ Reads the part of the grid inside a0_range x a1_range
+        Args:
+            a0_range, a1_range: (low, high) bounds, like the plt.xlim / plt.ylim
+                of a plot. One extra grid point is kept on each side so that
+                contour lines reach the edges. None means the whole axis.
+        Returns:
+            (a0s, a1s, values) for that window, ready for plt.contour.
+        """
+        def axis_slice(axis, bounds):
+            if bounds is None:
+                return slice(0, len(axis))
+            lo = max(np.searchsorted(axis, bounds[0], side='right') - 1, 0)
+            hi = min(np.searchsorted(axis, bounds[1], side='left') + 1, len(axis))
+            return slice(lo, hi)
+
+        cols = axis_slice(self.a0s, a0_range)
+        rows = axis_slice(self.a1s, a1_range)
+        return self.a0s[cols], self.a1s[rows], self.read(rows, cols)
+
+    def flush(self):
+        if isinstance(self.values, np.memmap):
+            self.values.flush()
+
+
+def run_path(run_name):
+    """ The store path of a run, for example 'grid_r1' for run 'r1' """
+    return 'grid_' + run_name
+
+
+def open_run(run_name):
+    """ Opens the store of a run, as written by build_assets.py """
+    return GridStore.open(run_path(run_name))
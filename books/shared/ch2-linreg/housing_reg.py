@@ -0,0 +1,53 @@
+import numpy as np
+import datasets
+import least_squares
+import optimizers
+import standardizer
+import streaming
+
+### Hyperparameters ###
+
+BATCH_SIZE = 512
+CHUNK_SIZE = 65536
+SHUFFLE = True
+NUM_EPOCHS = 20
+LEARNING_RATE = 2000.0
+# Train on standardized features, with the statistics from one streaming pass
+SCALE_FEATURES = True
+
+# Predict the median house value from the numeric columns that are on a
+# comparable scale, streaming the CSV so it never has to fit in memory
+x_columns = ['housing_median_age', 'median_income']
+y_column = 'median_house_value'
+n = len(x_columns)
+
+
+### Training the model ###
+
+def make_batches():
+    return streaming.csv_batches("housing.csv", x_columns, y_column,
+                                 batch_size=BATCH_SIZE, shuffle=SHUFFLE, chunk_size=CHUNK_SIZE)
+
+# The scaling is folded into the parameters, so the batches are never rescaled
+scaler = None
+if SCALE_FEATURES:
+    scaler = standardizer.Standardizer.from_csv("housing.csv", x_columns, chunk_size=CHUNK_SIZE)
+    print("means = %s, deviations = %s" % (str(scaler.mean), str(scaler.std())))
+
+optimizer = optimizers.Adam(learning_rate=LEARNING_RATE)
+A, b, epoch_losses = streaming.train_minibatch(make_batches, n, optimizer=optimizer, num_epochs=NUM_EPOCHS,
+                                               standardizer=scaler)
+
+for epoch, epoch_loss in enumerate(epoch_losses):
+    print("epoch = %g, loss = %g" % (epoch, epoch_loss))
+print("A = %s, b = %g" % (str(A), b))
+
+
+### Comparing against the exact solution ###
+
+# housing.csv is small enough to load whole, so check the result
+X_data, y_data = datasets.load_xy("housing.csv", x_columns, y_column, dtype=np.float64)
+complete = ~(np.isnan(X_data).any(axis=0) | np.isnan(y_data[0]))
+X_data, y_data = X_data[:, complete], y_data[:, complete]
+exact_A, exact_b, exact_loss = least_squares.fit_exact(X_data, y_data, reduction='mean')
+print("exact: loss = %g, A = %s, b = %g" % (exact_loss, str(exact_A), exact_b))
@@ -0,0 +1,42 @@
+import numpy as np
+from sufficient_stats import SufficientStats
+
+
+def fit_exact(X_data, y_data, method='qr', reduction='sum'):
+    """ Solves the linear regression problem y = A x + b directly
+    Args:
+        X_data: n x m array of inputs (one column per data point).
+        y_data: 1 x m array of outputs.
+        method: 'qr' factors the m x (n+1) design matrix, which is the most
+            numerically stable. 'cholesky' factors the (n+1) x (n+1) Gram
+            matrix instead, which is cheaper for very tall data sets but
+            squares the condition number.
+        reduction: 'sum' (as in the chapter scripts) or 'mean', used for the
+            returned loss.
+    Returns:
+        (A, b, loss), with A of shape 1 x n, the same values the iterative
+        optimizers converge to.
+    """
+    X_data = np.asarray(X_data, dtype=np.float64)
+    y_data = np.asarray(y_data, dtype=np.float64).reshape(-1)
+    m = X_data.shape[1]
+
+    if method == 'qr':
+        # Design matrix with a column of ones for b
+        X_design = np.column_stack((X_data.T, np.ones(m)))
+        Q, R = np.linalg.qr(X_design)
+        theta = np.linalg.solve(R, Q.T.dot(y_data))
+        loss = ((X_design.dot(theta) - y_data)**2).sum()
+        if reduction == 'mean':
+            loss /= m
+        elif reduction != 'sum':
+            raise ValueError("unknown reduction %r" % reduction)
+    elif method == 'cholesky':
+        stats = SufficientStats.from_data(X_data, y_data)
+        L = np.linalg.cholesky(stats.G)
+        theta = np.linalg.solve(L.T, np.linalg.solve(L, stats.c))
+        loss = stats.loss(theta[:-1], theta[-1], reduction)
+    else:
+        raise ValueError("unknown method %r" % method)
+
+    return theta[:-1].reshape(1, -1), theta[-1], loss
@@ -0,0 +1,101 @@
+import numpy as np
+from grid_store import DEFAULT_TILE, GridStore
+from sufficient_stats import SufficientStats
+
+# Upper bound on the size of one block of predictions, in bytes.
+# 64 MB keeps a 1000 x 1000 grid over a few hundred rows comfortably in memory.
+DEFAULT_MAX_BYTES = 64 * 2**20
+
+
+def batch_loss(As, X_data, y_data, b=0.0, reduction='mean'):
+    """ Evaluates the squared error loss for many parameter vectors at once
+    Args:
+        As: K x n array, each row is one value of A.
+        X_data: n x m array of inputs (one column per data point).
+        y_data: 1 x m array of outputs.
+        b: the intercept, shared by all rows of As.
+        reduction: 'mean' (as in scaling_temp.py) or 'sum' (as in the chapter scripts).
+    Returns:
+        Array of K losses.
+    """
+    As = np.asarray(As, dtype=np.float64)
+    X_data = np.asarray(X_data, dtype=np.float64)
+    y_data = np.asarray(y_data, dtype=np.float64).reshape(1, -1)
+
+    # One matmul gives the predictions of all K models for all m points
+    residuals = As.dot(X_data) + b - y_data
+    losses = (residuals**2).sum(axis=1)
+    if reduction == 'mean':
+        losses /= X_data.shape[1]
+    elif reduction != 'sum':
+        raise ValueError("unknown reduction %r" % reduction)
+    return losses
+
+
+def loss_grid(X_data, y_data, a0s, a1s, b=0.0, reduction='mean', max_bytes=DEFAULT_MAX_BYTES, method='direct'):
+    """ Evaluates the loss of y = A x + b over the grid of A = [a0, a1]
+    Args:
+        X_data: 2 x m array of inputs.
+        y_data: 1 x m array of outputs.
+        a0s, a1s: 1-d arrays of values for A[0] and A[1].
+        b: the intercept.
+        reduction: 'mean' or 'sum', see batch_loss.
+        max_bytes: memory budget for one block of predictions.
+        method: 'direct' computes the residuals of every grid point, 'gram'
+            computes the sufficient statistics of the data once and then costs
+            O(n^2) per grid point, independent of m.
+    Returns:
+        Array ls of shape (len(a0s), len(a1s)) with ls[i, j] the loss at
+        A = [a0s[i], a1s[j]], the layout scaling_temp.py has always saved.
+    """
+    a0s = np.asarray(a0s, dtype=np.float64)
+    a1s = np.asarray(a1s, dtype=np.float64)
+    if method == 'gram':
+        return SufficientStats.from_data(X_data, y_data).loss_grid(a0s, a1s, b, reduction)
+    elif method != 'direct':
+        raise ValueError("unknown method %r" % method)
+
+    # Flatten the grid into a K x 2 list of parameter vectors, in the same
+    # row-major order as ls, so that blocks can be written back contiguously
+    A0, A1 = np.meshgrid(a0s, a1s, indexing='ij')
+    As = np.column_stack((A0.ravel(), A1.ravel()))
+    return _blocked_batch_loss(As, X_data, y_data, b, reduction, max_bytes).reshape(A0.shape)
+
+
+def _blocked_batch_loss(As, X_data, y_data, b, reduction, max_bytes):
+    # batch_loss over As, in blocks small enough to fit in max_bytes
+    m = np.asarray(X_data).shape[1]
+    losses = np.empty(len(As))
+    block = max(1, max_bytes // (8 * max(m, 1)))
+    for start in range(0, len(As), block):
+        stop = start + block
+        losses[start:stop] = batch_loss(As[start:stop], X_data, y_data, b, reduction)
+    return losses
+
+
+def loss_grid_store(path, X_data, y_data, a0s, a1s, b=0.0, reduction='mean', max_bytes=DEFAULT_MAX_BYTES,
+                    method='direct', tile=DEFAULT_TILE):
+    """ Evaluates the same loss as loss_grid, straight into a GridStore at path
+    The grid is computed one band of tile rows at a time, so memory use is
+    bounded by the band rather than the whole grid, and values are laid out as
+    in grid_store.py: values[j, i] is the loss at A = [a0s[i], a1s[j]].
+    Returns:
+        The GridStore.
+    """
+    a0s = np.asarray(a0s, dtype=np.float64)
+    a1s = np.asarray(a1s, dtype=np.float64)
+    if method == 'gram':
+        stats = SufficientStats.from_data(X_data, y_data)
+        evaluate = lambda As: stats.batch_loss(As, b, reduction)
+    elif method == 'direct':
+        evaluate = lambda As: _blocked_batch_loss(As, X_data, y_data, b, reduction, max_bytes)
+    else:
+        raise ValueError("unknown method %r" % method)
+
+    store = GridStore.create(path, a0s, a1s, tile)
+    for row in range(0, len(a1s), store.tile):
+        A1, A0 = np.meshgrid(a1s[row:row + store.tile], a0s, indexing='ij')
+        As = np.column_stack((A0.ravel(), A1.ravel()))
+        store.write(row, 0, evaluate(As).reshape(A0.shape))
+    store.flush()
+    return store
@@ -4,6 +4,8 @@ import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 
 
+# The 20 x 20 grid shown in the book. For random data sets of any size with
+# the same coefficients, use: python synth_data.py OUT --preset scaling --rows ROWS
 n = 20
 xr = np.linspace(0, 10, n)
 yr = np.linspace(0, 1000, n)
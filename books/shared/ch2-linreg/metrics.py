@@ -0,0 +1,83 @@
+import collections
+import queue
+import sys
+import threading
+
+import numpy as np
+
+
+def _snapshot(value):
+    # Copy a parameter as it is right now, without forcing it to the host.
+    # PyTorch tensors are cloned (the optimizer updates them in place), and
+    # numpy arrays are copied, everything else is kept as is.
+    if hasattr(value, 'detach'):
+        return value.detach().clone()
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    return value
+
+
+def _format(value):
+    value = np.asarray(value)
+    if value.size == 1:
+        return "%g" % value.item()
+    return str(value)
+
+
+class MetricsLogger(object):
+    """ Records (t, loss, params) every report_every steps of a training loop
+    The most recent capacity records are kept in memory, and are written to
+    the output from a background thread, so the training loop never waits on
+    printing or on converting values to text.
+    Args:
+        report_every: record one step out of every report_every.
+        capacity: number of records kept in the ring buffer.
+        out: file object to write to, defaults to sys.stdout. None disables output.
+    """
+
+    def __init__(self, report_every=100, capacity=1000, out=sys.stdout):
+        self.report_every = report_every
+        self.records = collections.deque(maxlen=capacity)
+        self.out = out
+        self._queue = queue.Queue()
+        self._writer = None
+        if out is not None:
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+
+    def should_log(self, t):
+        """ Whether step t will be recorded, so a caller can skip fetching metrics """
+        return t % self.report_every == 0
+
+    def log(self, t, loss, **params):
+        """ Records the loss and the named parameters at step t, if it is a reporting step """
+        if not self.should_log(t):
+            return
+        record = (t, _snapshot(loss), {name: _snapshot(value) for name, value in params.items()})
+        self.records.append(record)
+        if self._writer is not None:
+            self._queue.put(record)
+
+    def _write_loop(self):
+        while True:
+            record = self._queue.get()
+            if record is None:
+                break
+            t, loss, params = record
+            fields = ["t = %g" % t, "loss = %s" % _format(loss)]
+            fields += ["%s = %s" % (name, _format(value)) for name, value in params.items()]
+            self.out.write(", ".join(fields) + "\n")
+
+    def history(self):
+        """ Returns the recorded steps and losses as numpy arrays """
+        ts = np.array([t for t, _, _ in self.records])
+        losses = np.array([float(np.asarray(loss)) for _, loss, _ in self.records])
+        return ts, losses
+
+    def close(self):
+        """ Waits for all records to be written """
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+            self.out.flush()
@@ -0,0 +1,65 @@
+import numpy as np
+
+# Optimizers acting in place on a flat numpy parameter vector theta, used by
+# the numpy trainers (streaming.py, sweep.py). Their update rules follow the
+# PyTorch optimizers of the same name.
+
+
+class GradientDescent(object):
+    """ Plain gradient descent """
+
+    def __init__(self, learning_rate=0.01):
+        self.learning_rate = learning_rate
+
+    def step(self, theta, grad):
+        """ Updates theta in place given its gradient """
+        theta -= self.learning_rate * grad
+
+
+class Adagrad(object):
+    """ The Adagrad optimizer """
+
+    def __init__(self, learning_rate=0.01, epsilon=1e-10):
+        self.learning_rate = learning_rate
+        self.epsilon = epsilon
+        self.sum_sq = None
+
+    def step(self, theta, grad):
+        """ Updates theta in place given its gradient """
+        if self.sum_sq is None:
+            self.sum_sq = np.zeros_like(theta)
+        self.sum_sq += grad**2
+        theta -= self.learning_rate * grad / (np.sqrt(self.sum_sq) + self.epsilon)
+
+
+class Adam(object):
+    """ The Adam optimizer """
+
+    def __init__(self, learning_rate=0.001, beta1=0.9, beta2=0.999, epsilon=1e-8):
+        self.learning_rate = learning_rate
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.epsilon = epsilon
+        self.t = 0
+        self.m = None
+        self.v = None
+
+    def step(self, theta, grad):
+        """ Updates theta in place given its gradient """
+        if self.m is None:
+            self.m = np.zeros_like(theta)
+            self.v = np.zeros_like(theta)
+        self.t += 1
+        self.m = self.beta1 * self.m + (1 - self.beta1) * grad
+        self.v = self.beta2 * self.v + (1 - self.beta2) * grad**2
+        m_hat = self.m / (1 - self.beta1**self.t)
+        v_hat = self.v / (1 - self.beta2**self.t)
+        theta -= self.learning_rate * m_hat / (np.sqrt(v_hat) + self.epsilon)
+
+
+# Optimizers by name, for configuration files and sweeps
+OPTIMIZERS = {
+    'gd': GradientDescent,
+    'adagrad': Adagrad,
+    'adam': Adam,
+}
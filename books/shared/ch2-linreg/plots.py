@@ -0,0 +1,60 @@
+import numpy as np
+import matplotlib.pyplot as plt
+
+# The plots of the feature scaling chapter, shared by the scripts drawing
+# them from different sources (grid stores, adaptive surfaces, batched runs).
+
+
+def loss_contour(a0s, a1s, ls, levels, trace, minimum, title, xlim, ylim, num_labels=10):
+    """ Draws the level sets of a loss surface, with an optimizer trace over them
+    Args:
+        a0s, a1s, ls: the surface, with ls of shape (len(a1s), len(a0s)).
+        levels: the contour levels, passed to plt.contour.
+        trace: T x 2 array of the [A[0], A[1]] values visited by the optimizer.
+        minimum: (A[0], A[1]) of the true minimum, marked with a red cross.
+        title: the plot title.
+        xlim, ylim: the plotted window.
+        num_labels: the first num_labels points of the trace are numbered.
+    Returns:
+        The contour set.
+    """
+    contours = plt.contour(a0s, a1s, ls, levels)
+    plt.scatter(minimum[0], minimum[1], c='r', marker='x')
+    plt.scatter(trace[:,0], trace[:,1])
+    plt.title(title)
+    plt.xlabel('A[0]')
+    plt.ylabel('A[1]')
+    plt.xlim(*xlim)
+    plt.ylim(*ylim)
+
+    for i in range(min(num_labels, len(trace))):
+        plt.annotate(i, (trace[i,0], trace[i,1]))
+    return contours
+
+
+def parameter_and_loss(runs, a0_label='A[0]', a0_range=(0, 60), loss_range=(10, 60)):
+    """ Plots A[0] and the loss against the iteration, side by side, for each run
+    Args:
+        runs: traces in the run1.npy layout, one row per iteration holding A[0], A[1] and the loss.
+        a0_label: the label of A[0] in the titles ('$A_0$' with usetex).
+        a0_range, loss_range: (start, end) iterations plotted in each panel.
+    """
+    plt.figure(num=None, figsize=(10, 4), dpi=80)
+
+    plt.subplot(1, 2, 1)
+    iterations = np.arange(*a0_range)
+    for run in runs:
+        plt.plot(iterations, run[a0_range[0]:a0_range[1], 0])
+    plt.title('Value of ' + a0_label)
+    plt.xlabel('Iteration')
+    plt.ylabel(a0_label)
+    plt.ylim(1.0, 2.0)
+
+    plt.subplot(1, 2, 2)
+    iterations = np.arange(*loss_range)
+    for run in runs:
+        plt.plot(iterations, run[loss_range[0]:loss_range[1], -1])
+    plt.title('Value of the loss function')
+    plt.xlabel('Iteration')
+    plt.ylabel('Loss function')
+    plt.ylim(bottom=0)
@@ -0,0 +1,40 @@
+import numpy as np
+import matplotlib.pyplot as plt
+import batched
+import datasets
+import optimizers
+import plots
+
+### Hyperparameters ###
+
+# One model per entry, trained side by side: the unscaled and scaled runs
+# that scaling_temp.py produced one at a time as run1.npy and run2.npy
+DIV_YS = [1, 100]
+LEARNING_RATES = [0.0000025, 0.01]
+NUM_ITERS = 5000
+
+# Load X_data (2 x m) and y_data (1 x m) from the binary cache of the CSV file
+X_data, y_data = datasets.load_xy("linreg-scaling-synthetic.csv", [0, 1], 2, header=None, dtype=np.float64)
+
+
+### Training all the models at once ###
+
+K = len(DIV_YS)
+A_init = np.array([[1.5, 0.1 * div_y] for div_y in DIV_YS])
+feature_scales = np.array([[1, div_y] for div_y in DIV_YS])
+optimizer = optimizers.GradientDescent(learning_rate=np.reshape(LEARNING_RATES, (K, 1)))
+
+runs = batched.train_batched(X_data, y_data, A_init, optimizer, NUM_ITERS, feature_scales=feature_scales)
+
+
+### Plotting, as in scaling_plot.py ###
+
+start_idx1 = 0
+end_idx1 = 60
+
+start_idx2 = 10
+end_idx2 = 60
+
+plots.parameter_and_loss(runs, 'A[0]', (start_idx1, end_idx1), (start_idx2, end_idx2))
+
+plt.show()
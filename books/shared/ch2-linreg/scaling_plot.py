@@ -0,0 +1,20 @@
+import numpy as np
+import matplotlib.pyplot as plt
+import plots
+
+r1 = np.load('run1.npy')
+r2 = np.load('run2.npy')
+
+start_idx1 = 0
+end_idx1 = 60
+
+start_idx2 = 10
+end_idx2 = 60
+# end_idx = 200
+
+plt.rc('text', usetex=True)
+plt.rc('font', family='serif')
+
+plots.parameter_and_loss([r1, r2], '$A_0$', (start_idx1, end_idx1), (start_idx2, end_idx2))
+
+plt.show()
@@ -0,0 +1,113 @@
+import numpy as np
+import tensorflow as tf
+import matplotlib.pyplot as plt
+import datasets
+import grid_store
+import loss_surface
+import trajectory
+from sufficient_stats import SufficientStats, descent_trace
+
+### Hyperparameters ###
+
+# fs = 2*xs + 0.013*ys + 4
+
+LEARNING_RATE = 0.0000025 # 0.01 0.0000025
+OPTIMIZER_CONSTRUCTOR = tf.train.GradientDescentOptimizer
+NUM_ITERS = 5000
+DIV_Y = 1 # 1
+GRID_SIZE = 100
+LOSS_METHOD = 'gram' # 'direct' 'gram'
+# Save the trace of the descent to run1.npy: "session" trains with the
+# optimizer below, "stats" runs the same descent from the sufficient
+# statistics of the data (see sufficient_stats.py), None skips it
+RECORD_RUN = None
+RECORD_STRIDE = 1
+# DIV_X_1 = 1
+# SUB_Y = 13
+
+# We load the first 2 columns into X_data and the last column into y_data,
+# already flipped, from the binary cache of the CSV file
+X_data, y_data = datasets.load_xy("linreg-scaling-synthetic.csv", [0, 1], 2, header=None, dtype=np.float64)
+X_data = np.matrix(X_data) # A copy, since the cache is read-only
+X_data[1, :] = X_data[1, :] / DIV_Y
+
+# And make a convenient variable to remember the number of input columns
+n = 2
+
+# Define data placeholders
+x = tf.placeholder(tf.float32, shape=(n, None))
+y = tf.placeholder(tf.float32, shape=(1, None))
+
+# Define trainable variables
+A = tf.get_variable("A", initializer=tf.constant([1.5, 0.1 * DIV_Y], shape=(1, n)))
+# b = tf.get_variable("b", initializer=tf.constant(1, dtype=tf.float32))
+
+# Define model output
+y_predicted = tf.matmul(A, x)
+
+# Define the loss function
+L = tf.reduce_mean((y_predicted - y)**2)
+
+
+# log_name = "%g; %g, %s" % (DIV_Y, LEARNING_RATE, OPTIMIZER_CONSTRUCTOR.__name__)
+# tf.summary.scalar('A_0', A[0,0])
+# tf.summary.scalar('A_1', A[0,1] / DIV_Y)
+# # tf.summary.scalar('b', b)
+# tf.summary.scalar('L', L)
+# summary_node = tf.summary.merge_all()
+# summary_writer = tf.summary.FileWriter('/tmp/tensorflow/scaling_temp/' + log_name)
+# print("Open /tmp/tensorflow/scaling_temp/ with tensorboard")
+
+
+# Define optimizer object
+optimizer = OPTIMIZER_CONSTRUCTOR(learning_rate=LEARNING_RATE).minimize(L)
+
+# Create a session and initialize variables
+session = tf.Session()
+session.run(tf.global_variables_initializer())
+
+# Main optimization loop, recording the trace to a trajectory file as it goes
+if RECORD_RUN == "session":
+    grad_norm = tf.norm(tf.gradients(L, A)[0])
+    recorder = trajectory.TrajectoryRecorder('run1_trace', ['A_0', 'A_1'], stride=RECORD_STRIDE)
+    for t in range(NUM_ITERS):
+        current_loss, current_A, current_grad_norm, _ = session.run([L, A, grad_norm, optimizer], feed_dict={
+            x: X_data,
+            y: y_data
+        })
+        recorder.record(t, current_A, current_loss, current_grad_norm)
+        # summary_writer.add_summary(summary, t)
+        # print("t = %g, loss = %g" % (t, current_loss))
+    recorder.close()
+    np.save('run1', trajectory.load_run('run1_trace'))
+elif RECORD_RUN == "stats":
+    # The same descent, where each step costs the same however many rows the CSV has
+    stats = SufficientStats.from_data(X_data, y_data)
+    recorder = trajectory.TrajectoryRecorder('run1_trace', ['A_0', 'A_1'], stride=RECORD_STRIDE)
+    descent_trace(stats, [1.5, 0.1 * DIV_Y], LEARNING_RATE, NUM_ITERS, b=0.0, recorder=recorder)
+    recorder.close()
+    np.save('run1', trajectory.load_run('run1_trace'))
+elif RECORD_RUN is not None:
+    raise ValueError("unknown RECORD_RUN %r" % RECORD_RUN)
+
+
+### Loss surface ###
+
+# Evaluate the loss over the whole grid of A values in batched passes,
+# rather than with one session.run per grid point, straight into a chunked,
+# memory-mapped grid store (see grid_store.py). The grid_r1 / grid_r2 stores
+# of the plots are written by build_assets.py, this one is only for exploring
+a0s = np.linspace(-3, 3, num=GRID_SIZE)
+a1s = np.linspace(-1, 5, num=GRID_SIZE)
+store = loss_surface.loss_grid_store(grid_store.run_path('temp'), X_data, y_data, a0s, a1s, method=LOSS_METHOD)
+
+# The store is already in the orientation plt.contour expects
+a0s, a1s, ls = store.window()
+
+levels = np.linspace(8.5, 700)
+plt.contour(a0s, a1s, ls, 20)
+# plt.scatter(1.3, 2.0, c='r')
+plt.title('Level sets of the loss function')
+plt.xlabel('A[0]')
+plt.ylabel('A[1]')
+plt.show()
\ No newline at end of file
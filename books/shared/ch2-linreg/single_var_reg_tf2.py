@@ -0,0 +1,43 @@
+import numpy as np
+import tensorflow as tf
+import pandas as pd
+import matplotlib.pyplot as plt
+import tf2_training
+
+### Hyperparameters ###
+
+LEARNING_RATE = 0.2
+NUM_ITERS = 10000
+# Number of iterations run inside the traced tf.function per call from Python
+STEPS_PER_CALL = 1000
+
+# Load the data, and convert to 1x30 vectors
+D = pd.read_csv("homicide.csv")
+x_data = np.matrix(D.age.values)
+y_data = np.matrix(D.num_homicide_deaths.values)
+
+
+### Training the model ###
+
+def report(t, current_loss, current_A, current_b):
+    print("t = %g, loss = %g, a = %g, b = %g" % (t, current_loss, current_A[0, 0], current_b))
+
+optimizer = tf.keras.optimizers.Adam(learning_rate=LEARNING_RATE)
+model = tf2_training.fit(x_data, y_data, optimizer, NUM_ITERS, steps_per_call=STEPS_PER_CALL, callback=report)
+
+
+### Using the trained model to make predictions
+
+# x_test_data has values similar to [20.0, 20.1, 20.2, ..., 54.9, 55.0]
+x_test_data = np.matrix(np.linspace(20, 55), dtype=np.float32)
+
+# Predict the homicide rate for each age in x_test_data
+y_test_data = model(tf.constant(x_test_data)).numpy()
+
+# Plot the original data and the prediction line
+plt.plot(x_data.T, y_data.T, 'x')
+plt.plot(x_test_data.T, y_test_data.T)
+plt.xlabel('Age')
+plt.ylabel('US Homicide Deaths in 2015')
+plt.title('Age and homicide death linear regression')
+plt.show()
@@ -0,0 +1,136 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Feature scaling statistics computed in one pass over chunks of a data set.
+# Each chunk gives its count, mean and sum of squared deviations M2, and two
+# parts combine exactly (Chan et al.'s parallel form of Welford's update):
+#
+#   delta = mean_b - mean_a
+#   mean  = mean_a + delta * m_b / m
+#   M2    = M2_a + M2_b + delta^2 * m_a * m_b / m
+#
+# so chunks can be processed in any order, or in parallel, without the
+# cancellation of the sum(x^2) - m mean^2 formula.
+#
+# The statistics are then folded into the parameters rather than the data:
+# the scaled model
+#
+#   y = A_s (x - means) / deviations + b_s
+#
+# is the plain model y = A x + b on the raw x, with
+#
+#   A = A_s / deviations,  b = b_s - A . means
+#
+# so training in the scaled coordinates never needs a scaled copy of X.
+
+
+class Standardizer(object):
+    """ Running mean and variance of each feature
+    Attributes:
+        count: number of data points seen.
+        mean: length n array, the mean of each feature.
+        m2: length n array, the sum of squared deviations from the mean.
+    """
+
+    def __init__(self, count, mean, m2):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    @classmethod
+    def from_data(cls, X_data):
+        """ Computes the statistics of an n x m X_data """
+        X_data = np.asarray(X_data, dtype=np.float64)
+        mean = X_data.mean(axis=1)
+        centered = X_data - mean[:, None]
+        return cls(X_data.shape[1], mean, np.einsum('ij,ij->i', centered, centered))
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """ Computes the statistics of an iterable of n x k chunks in one pass """
+        return _merge_all(cls.from_data(chunk) for chunk in chunks)
+
+    @classmethod
+    def from_array(cls, X_data, chunk_rows=2**20, workers=None):
+        """ Computes the statistics of an n x m array, chunk_rows columns at a time, in parallel
+        Args:
+            X_data: the data, for example a memory map from datasets.load or
+                synth_data.generate_file, so it may be larger than memory.
+            chunk_rows: data points per chunk, bounding the memory of each worker.
+            workers: number of threads, or None for the default. NumPy releases
+                the GIL in the reductions, so threads run in parallel.
+        """
+        m = X_data.shape[1]
+        with ThreadPoolExecutor(workers) as pool:
+            return _merge_all(pool.map(lambda start: cls.from_data(X_data[:, start:start + chunk_rows]),
+                                       range(0, m, chunk_rows)))
+
+    @classmethod
+    def from_csv(cls, path, x_columns, chunk_size=65536, header='infer'):
+        """ Computes the statistics of columns of a CSV file, reading chunk_size rows at a time
+        Rows with missing values are skipped, like in streaming.csv_batches.
+        """
+        chunks = (chunk[list(x_columns)].dropna().values.T
+                  for chunk in pd.read_csv(path, header=header, usecols=x_columns, chunksize=chunk_size))
+        return cls.from_chunks(chunk for chunk in chunks if chunk.shape[1] > 0)
+
+    def merge(self, other):
+        """ Combines the statistics of two disjoint parts of a data set """
+        count = self.count + other.count
+        if count == 0:
+            return Standardizer(0, self.mean, self.m2)
+        delta = other.mean - self.mean
+        mean = self.mean + delta * (other.count / count)
+        m2 = self.m2 + other.m2 + delta**2 * (self.count * other.count / count)
+        return Standardizer(count, mean, m2)
+
+    @property
+    def n(self):
+        return len(self.mean)
+
+    def variance(self, ddof=0):
+        """ The variance of each feature, ddof=1 for the sample variance """
+        return self.m2 / max(self.count - ddof, 1)
+
+    def std(self, ddof=0):
+        """ The standard deviation of each feature. Constant features get 1, so they are only centered """
+        deviations = np.sqrt(self.variance(ddof))
+        return np.where(deviations > 0, deviations, 1.0)
+
+    def transform(self, X_data, ddof=0):
+        """ Returns the scaled copy of X_data, (X_data - means) / deviations """
+        return (np.asarray(X_data) - self.mean[:, None]) / self.std(ddof)[:, None]
+
+    def fold(self, A_scaled, b_scaled, ddof=0):
+        """ Converts parameters of the scaled model to parameters on the raw features
+        Args:
+            A_scaled, b_scaled: parameters of y = A_s (x - means) / deviations + b_s.
+            ddof: passed to std, it must match the one the scaled model uses.
+        Returns:
+            (A, b) with A of shape 1 x n, such that y = A x + b is the same model.
+        """
+        A = np.reshape(A_scaled, (1, self.n)) / self.std(ddof)
+        return A, float(np.reshape(b_scaled, -1)[0] - A.dot(self.mean)[0])
+
+    def unfold(self, A, b, ddof=0):
+        """ The inverse of fold, converting parameters on the raw features to the scaled model """
+        A = np.reshape(A, (1, self.n))
+        return A * self.std(ddof), float(np.reshape(b, -1)[0] + A.dot(self.mean)[0])
+
+    def scaled_gradient(self, grad_A, grad_b, ddof=0):
+        """ Converts the gradient with respect to the raw parameters (A, b) of fold into
+        the gradient with respect to the scaled ones (A_s, b_s), by the chain rule
+        """
+        grad_A = np.reshape(grad_A, -1)
+        return (grad_A - grad_b * self.mean) / self.std(ddof), grad_b
+
+
+def _merge_all(parts):
+    total = None
+    for part in parts:
+        total = part if total is None else total.merge(part)
+    if total is None:
+        raise ValueError("no data points")
+    return total
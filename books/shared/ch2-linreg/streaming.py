@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from optimizers import Adam
+
+
+def csv_batches(path, x_columns, y_column, batch_size=256, shuffle=False, chunk_size=65536, seed=None, header='infer'):
+    """ Streams mini-batches out of a CSV file, reading it chunk_size rows at a time
+    Args:
+        path: the CSV file.
+        x_columns: list of input columns (names, or indices if header=None).
+        y_column: the output column.
+        batch_size: number of data points per batch.
+        shuffle: if True, rows are shuffled within a window of chunk_size rows,
+            so memory stays bounded however large the file is.
+        chunk_size: number of rows read from the file at once.
+        seed: seed for the shuffling.
+        header: passed to pd.read_csv, use None for the synthetic data sets.
+    Yields:
+        (X_batch, y_batch), of shapes n x k and 1 x k, laid out like X_data
+        and y_data in the chapter scripts. Rows with missing values are skipped.
+    """
+    rng = np.random.RandomState(seed)
+    columns = list(x_columns) + [y_column]
+    leftover = np.empty((0, len(columns)))
+
+    for chunk in pd.read_csv(path, header=header, usecols=columns, chunksize=chunk_size):
+        # usecols does not preserve order, so select the columns explicitly
+        rows = chunk[columns].dropna().values.astype(np.float64)
+        rows = np.vstack((leftover, rows))
+        if shuffle:
+            rows = rows[rng.permutation(len(rows))]
+
+        num_full = len(rows) // batch_size * batch_size
+        for start in range(0, num_full, batch_size):
+            batch = rows[start:start + batch_size]
+            yield batch[:, :-1].T, batch[:, -1:].T
+        leftover = rows[num_full:]
+
+    if len(leftover) > 0:
+        yield leftover[:, :-1].T, leftover[:, -1:].T
+
+
+def train_minibatch(make_batches, n, optimizer=None, num_epochs=1, A_init=None, b_init=0.0, standardizer=None):
+    """ Trains y = A x + b on a stream of mini-batches, minimizing the mean squared error
+    Args:
+        make_batches: function returning a fresh iterator of (X_batch, y_batch)
+            for each epoch, for example a lambda around csv_batches.
+        n: number of input columns.
+        optimizer: an object with a step(theta, grad) method, defaults to Adam.
+        num_epochs: number of passes over the data.
+        A_init, b_init: initial parameter values, A defaults to zeros.
+        standardizer: optional standardizer.Standardizer of the inputs. The
+            optimizer then steps on the parameters of the scaled features,
+            while the batches stay raw, see standardizer.py.
+    Returns:
+        (A, b, epoch_losses), with A of shape 1 x n and epoch_losses holding the
+        mean batch loss of each epoch. A and b are always for the raw inputs.
+    """
+    optimizer = optimizer or Adam()
+    theta = np.zeros(n + 1)
+    if A_init is not None:
+        theta[:-1] = np.reshape(A_init, -1)
+    theta[-1] = b_init
+    if standardizer is not None:
+        A_scaled, theta[-1] = standardizer.unfold(theta[:-1], theta[-1])
+        theta[:-1] = A_scaled[0]
+
+    epoch_losses = []
+    for epoch in range(num_epochs):
+        total_loss = 0.0
+        num_batches = 0
+        for X_batch, y_batch in make_batches():
+            if standardizer is None:
+                A, b = theta[:-1], theta[-1]
+            else:
+                A, b = standardizer.fold(theta[:-1], theta[-1])
+                A = A[0]
+
+            k = X_batch.shape[1]
+            residuals = A.dot(X_batch) + b - y_batch[0]
+            total_loss += residuals.dot(residuals) / k
+            num_batches += 1
+
+            grad = np.empty(n + 1)
+            grad[:-1] = 2 * X_batch.dot(residuals) / k
+            grad[-1] = 2 * residuals.sum() / k
+            if standardizer is not None:
+                grad[:-1], grad[-1] = standardizer.scaled_gradient(grad[:-1], grad[-1])
+            optimizer.step(theta, grad)
+        epoch_losses.append(total_loss / max(num_batches, 1))
+
+    if standardizer is not None:
+        A, b = standardizer.fold(theta[:-1], theta[-1])
+        return A, b, epoch_losses
+    return theta[:-1].reshape(1, -1), theta[-1], epoch_losses
@@ -0,0 +1,115 @@
+import numpy as np
+
+# The squared error loss of y = A x + b is a quadratic form in theta = [A, b]:
+#
+#   L(theta) = theta G theta^T - 2 theta c + yy
+#
+# where x~ is x with a 1 appended, G = sum x~ x~^T, c = sum x~ y and
+# yy = sum y^2. Once G, c and yy are known, the loss and gradient at any
+# theta cost O(n^2), no matter how many rows the data set has.
+
+
+class SufficientStats(object):
+    """ Gram statistics of a linear regression data set
+    Attributes:
+        G: (n+1) x (n+1) array, sum of x~ x~^T.
+        c: length n+1 array, sum of x~ y.
+        yy: sum of y^2.
+        m: number of data points.
+    """
+
+    def __init__(self, G, c, yy, m):
+        self.G = G
+        self.c = c
+        self.yy = yy
+        self.m = m
+
+    @classmethod
+    def from_data(cls, X_data, y_data):
+        """ Computes the statistics of an n x m X_data and 1 x m y_data """
+        X_data = np.asarray(X_data, dtype=np.float64)
+        y_data = np.asarray(y_data, dtype=np.float64).reshape(-1)
+        X_aug = np.vstack((X_data, np.ones((1, X_data.shape[1]))))
+        return cls(X_aug.dot(X_aug.T), X_aug.dot(y_data), y_data.dot(y_data), X_data.shape[1])
+
+    def merge(self, other):
+        """ Combines the statistics of two disjoint parts of a data set """
+        return SufficientStats(self.G + other.G, self.c + other.c, self.yy + other.yy, self.m + other.m)
+
+    @property
+    def n(self):
+        return self.G.shape[0] - 1
+
+    def _thetas(self, As, b):
+        As = np.atleast_2d(np.asarray(As, dtype=np.float64))
+        bs = np.broadcast_to(np.asarray(b, dtype=np.float64), (As.shape[0],))
+        return np.column_stack((As, bs))
+
+    def _reduce(self, losses, reduction):
+        if reduction == 'mean':
+            return losses / self.m
+        elif reduction == 'sum':
+            return losses
+        raise ValueError("unknown reduction %r" % reduction)
+
+    def batch_loss(self, As, b=0.0, reduction='mean'):
+        """ Loss at each row of the K x n array As, see loss_surface.batch_loss """
+        thetas = self._thetas(As, b)
+        quad = np.einsum('ki,ij,kj->k', thetas, self.G, thetas)
+        losses = quad - 2 * thetas.dot(self.c) + self.yy
+        # Rounding can push the loss very slightly below 0 at the optimum
+        return self._reduce(np.maximum(losses, 0.0), reduction)
+
+    def loss(self, A, b=0.0, reduction='mean'):
+        """ Loss of a single 1 x n parameter A and intercept b """
+        return self.batch_loss(np.reshape(A, (1, -1)), b, reduction)[0]
+
+    def gradient(self, A, b=0.0, reduction='mean'):
+        """ Gradient of the loss, returned as (dL/dA of shape 1 x n, dL/db) """
+        theta = self._thetas(np.reshape(A, (1, -1)), b)[0]
+        grad = self._reduce(2 * (self.G.dot(theta) - self.c), reduction)
+        return grad[:-1].reshape(1, -1), grad[-1]
+
+    def loss_grid(self, a0s, a1s, b=0.0, reduction='mean'):
+        """ Loss over the grid A = [a0, a1], laid out as in loss_surface.loss_grid """
+        A0, A1 = np.meshgrid(a0s, a1s, indexing='ij')
+        As = np.column_stack((A0.ravel(), A1.ravel()))
+        return self.batch_loss(As, b, reduction).reshape(A0.shape)
+
+
+def descent_trace(stats, A_init, learning_rate, num_iters, b=None, reduction='mean', recorder=None):
+    """ Runs plain gradient descent on the loss described by stats
+    Args:
+        stats: a SufficientStats.
+        A_init: initial 1 x n value of A.
+        learning_rate: the step size.
+        num_iters: number of steps.
+        b: if None, b is trained starting from 0, otherwise it is held fixed.
+        reduction: 'mean' or 'sum'.
+        recorder: optional trajectory.TrajectoryRecorder. If given, each step
+            (with its gradient norm) is recorded into it instead, so long runs
+            are not held in memory.
+    Returns:
+        num_iters x (n+1) array, each row holding A after that step and the
+        loss before it, the same layout as the run1.npy / run2.npy traces
+        (which fetched the loss and A in the same session.run as the update),
+        or None when a recorder is given.
+    """
+    A = np.array(A_init, dtype=np.float64).reshape(1, -1)
+    train_b = b is None
+    b = 0.0 if train_b else b
+
+    run_data = np.empty((num_iters, stats.n + 1)) if recorder is None else None
+    for t in range(num_iters):
+        loss = stats.loss(A, b, reduction)
+        dA, db = stats.gradient(A, b, reduction)
+        A -= learning_rate * dA
+        if train_b:
+            b -= learning_rate * db
+        if recorder is None:
+            run_data[t, :-1] = A[0]
+            run_data[t, -1] = loss
+        else:
+            grad = np.append(dA, db) if train_b else dA
+            recorder.record(t, A, loss, np.linalg.norm(grad))
+    return run_data
@@ -0,0 +1,126 @@
+import concurrent.futures
+import functools
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+import datasets
+from optimizers import OPTIMIZERS
+from sufficient_stats import SufficientStats
+
+# The training problems a sweep can run, mirroring the chapter scripts:
+# 'homicide' is single_var_reg_optim.py (summed loss, trains a and b), and
+# 'scaling' is scaling_temp.py (mean loss, no b, starts at A = [1.5, 0.1 * DIV_Y]).
+WORKLOADS = {
+    'homicide': dict(path='homicide.csv', header='infer', x_columns=['age'], y_column='num_homicide_deaths',
+                     intercept=True, reduction='sum', A_init=[0.0]),
+    'scaling': dict(path='linreg-scaling-synthetic.csv', header=None, x_columns=[0, 1], y_column=2,
+                    intercept=False, reduction='mean', A_init=[1.5, 0.1]),
+}
+
+# Values used for any key missing from a configuration
+DEFAULT_CONFIG = dict(workload='scaling', optimizer='gd', learning_rate=0.0000025, div_y=1, num_iters=5000)
+
+# A run has converged once it has removed all but this fraction of its
+# initial excess loss over the exact optimum
+CONVERGENCE_TOLERANCE = 1e-3
+
+
+def grid(**axes):
+    """ Returns the list of all configurations in the cartesian product of axes
+    For example grid(optimizer=['gd', 'adam'], learning_rate=[0.01, 0.1]) gives 4 configurations.
+    """
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+
+@functools.lru_cache(maxsize=None)
+def _load_stats(workload, div_y):
+    # Each worker process loads each data set once
+    spec = WORKLOADS[workload]
+    X_data, y_data = datasets.load_xy(spec['path'], spec['x_columns'], spec['y_column'],
+                                      header=spec['header'], dtype=np.float64)
+    X_data = np.array(X_data) # A copy, since the cache is read-only
+    X_data[-1, :] = X_data[-1, :] / div_y
+    return SufficientStats.from_data(X_data, y_data)
+
+
+def _optimal_loss(stats, intercept, reduction):
+    k = stats.n + 1 if intercept else stats.n
+    theta = np.linalg.lstsq(stats.G[:k, :k], stats.c[:k], rcond=None)[0]
+    b = theta[-1] if intercept else 0.0
+    return stats.loss(theta[:stats.n], b, reduction)
+
+
+def run_config(config):
+    """ Trains one configuration, returning it together with its results """
+    config = dict(DEFAULT_CONFIG, **config)
+    spec = WORKLOADS[config['workload']]
+    stats = _load_stats(config['workload'], config['div_y'])
+    optimizer = OPTIMIZERS[config['optimizer']](learning_rate=config['learning_rate'])
+    intercept = spec['intercept']
+
+    # theta holds A, followed by b when it is trained. The last input column
+    # is divided by div_y, so its coefficient is multiplied to compensate.
+    theta = np.array(spec['A_init'], dtype=np.float64)
+    theta[-1] *= config['div_y']
+    if intercept:
+        theta = np.append(theta, 0.0)
+
+    start = time.perf_counter()
+    losses = np.empty(config['num_iters'])
+    with np.errstate(over='ignore', invalid='ignore'):
+        for t in range(config['num_iters']):
+            A = theta[:stats.n]
+            b = theta[-1] if intercept else 0.0
+            losses[t] = stats.loss(A, b, spec['reduction'])
+            if not np.isfinite(losses[t]):
+                losses[t:] = np.inf
+                break
+            dA, db = stats.gradient(A, b, spec['reduction'])
+            grad = np.append(dA[0], db) if intercept else dA[0]
+            optimizer.step(theta, grad)
+    seconds = time.perf_counter() - start
+
+    optimal_loss = _optimal_loss(stats, intercept, spec['reduction'])
+    excess = losses - optimal_loss
+    converged = np.nonzero(excess <= CONVERGENCE_TOLERANCE * excess[0])[0]
+
+    result = dict(config)
+    result.update(
+        final_loss=losses[-1],
+        optimal_loss=optimal_loss,
+        converged_step=converged[0] if len(converged) > 0 else -1,
+        seconds=seconds,
+    )
+    return result
+
+
+def run_sweep(configs, max_workers=None):
+    """ Runs all configurations across a pool of processes
+    Returns:
+        A pandas DataFrame with one row per configuration, holding the
+        configuration, its final loss, the exact optimal loss, the step at
+        which it converged (-1 if it did not) and its training time.
+    """
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(run_config, configs))
+    return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    # The learning rates and scalings tried out in scaling_temp.py
+    configs = grid(
+        workload=['scaling'],
+        optimizer=['gd', 'adagrad', 'adam'],
+        learning_rate=[0.0000025, 0.01, 0.1, 1.0],
+        div_y=[1, 100],
+        num_iters=[5000],
+    )
+
+    start = time.perf_counter()
+    results = run_sweep(configs)
+    print(results.sort_values('final_loss').to_string(index=False))
+    print("%d configurations in %.2f s" % (len(configs), time.perf_counter() - start))
+    results.to_csv('sweep_results.csv', index=False)
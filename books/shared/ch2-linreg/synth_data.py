@@ -0,0 +1,159 @@
+import argparse
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Generates synthetic linear regression data sets of any size,
+#
+#   y = coefficients . x + intercept + noise * N(0, 1)
+#
+# with each feature drawn uniformly from [low, high]. Rows are generated in
+# chunks, in parallel, and each chunk has its own random generator seeded
+# from (seed, chunk index), so the data only depends on the seed and the
+# chunk size, not on the number of workers or the order chunks finish in.
+#
+# Two sinks are supported:
+#   npy  a (n+1) x m float array, one row per column (the features, then y),
+#        the same layout as the datasets.py cache, so np.load(path, mmap_mode='r')
+#        gives X_data = data[:n] and y_data = data[n:] without a copy
+#   csv  one line per data point, features then y, without a header, like
+#        the CSVs written by make_scaling_data.py
+#
+# Usage:
+#   python synth_data.py OUT (--preset scaling | --coefficients 2,1.3 --intercept 4 ...) --rows 1e9
+
+DEFAULT_CHUNK_ROWS = 2**20
+
+# The data sets of make_mult_data.py and make_scaling_data.py, with random
+# rather than grid points
+PRESETS = {
+    'mult': dict(coefficients=[2, 1.3], intercept=4, noise=3, low=[0, 0], high=[10, 10]),
+    'scaling': dict(coefficients=[2, 0.013], intercept=0, noise=0, low=[0, 0], high=[10, 1000]),
+}
+
+
+def generate_chunk(index, rows, seed, coefficients, intercept=0.0, noise=0.0, low=0.0, high=1.0, dtype=np.float32):
+    """ Generates chunk number index, of rows data points
+    Args:
+        index: the chunk index, which with seed determines its random generator.
+        rows: number of data points in the chunk.
+        seed: the seed of the whole data set.
+        coefficients: the n true coefficients.
+        intercept: the true intercept.
+        noise: standard deviation of the Gaussian noise added to y.
+        low, high: scalars or length n sequences, the range of each feature.
+        dtype: the dtype of the result.
+    Returns:
+        (n+1) x rows array: the features, then y.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+    coefficients = np.asarray(coefficients, dtype=np.float64)
+    n = len(coefficients)
+    low = np.broadcast_to(np.asarray(low, dtype=np.float64), (n,))
+    high = np.broadcast_to(np.asarray(high, dtype=np.float64), (n,))
+
+    chunk = np.empty((n + 1, rows), dtype=dtype)
+    X = rng.uniform(low[:, None], high[:, None], size=(n, rows))
+    chunk[:n] = X
+    chunk[n] = coefficients.dot(X) + intercept
+    if noise:
+        chunk[n] += noise * rng.standard_normal(rows)
+    return chunk
+
+
+def _chunks(rows, chunk_rows):
+    return [(index, start, min(chunk_rows, rows - start)) for index, start in enumerate(range(0, rows, chunk_rows))]
+
+
+def generate(rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS, **spec):
+    """ Generates a whole data set in memory, the same values generate_file would write
+    Returns:
+        (X_data, y_data), of shapes n x rows and 1 x rows.
+    """
+    data = np.hstack([generate_chunk(index, size, seed, **spec) for index, start, size in _chunks(rows, chunk_rows)])
+    n = data.shape[0] - 1
+    return data[:n], data[n:]
+
+
+def _write_npy_chunk(path, index, start, size, seed, spec):
+    data = np.load(path, mmap_mode='r+')
+    data[:, start:start + size] = generate_chunk(index, size, seed, **spec)
+    data.flush()
+    return size
+
+
+def _format_csv_chunk(index, size, seed, spec):
+    buffer = io.BytesIO()
+    np.savetxt(buffer, generate_chunk(index, size, seed, **spec).T, delimiter=',', fmt='%.9g')
+    return buffer.getvalue()
+
+
+def generate_file(path, rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS, workers=None, sink=None, **spec):
+    """ Writes a data set to path, generating its chunks in parallel
+    Args:
+        path: the output file.
+        rows: number of data points.
+        seed: the seed of the data set.
+        chunk_rows: data points per chunk. Changing it changes the data.
+        workers: number of worker processes, or None for one per CPU.
+        sink: 'npy' or 'csv', by default from the extension of path.
+        spec: the arguments of generate_chunk describing the data (coefficients, ...).
+    """
+    sink = sink or os.path.splitext(path)[1].lstrip('.')
+    n = len(spec['coefficients'])
+    chunks = _chunks(rows, chunk_rows)
+
+    with ProcessPoolExecutor(workers) as pool:
+        if sink == 'npy':
+            # Chunks are written straight into their place in the file
+            data = np.lib.format.open_memmap(path, mode='w+', dtype=spec.get('dtype', np.float32), shape=(n + 1, rows))
+            del data
+            futures = [pool.submit(_write_npy_chunk, path, index, start, size, seed, spec)
+                       for index, start, size in chunks]
+            for future in futures:
+                future.result()
+        elif sink == 'csv':
+            # Chunks are formatted in parallel, and appended in order. Only a
+            # few are in flight at once, so memory stays bounded.
+            in_flight = 2 * (workers or os.cpu_count() or 1)
+            with open(path, 'wb') as f:
+                for first in range(0, len(chunks), in_flight):
+                    futures = [pool.submit(_format_csv_chunk, index, size, seed, spec)
+                               for index, start, size in chunks[first:first + in_flight]]
+                    for future in futures:
+                        f.write(future.result())
+        else:
+            raise ValueError("unknown sink %r" % sink)
+
+
+def _floats(text):
+    return [float(v) for v in text.split(',')]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a synthetic linear regression data set")
+    parser.add_argument('out', help="output file, .npy or .csv")
+    parser.add_argument('--preset', choices=sorted(PRESETS), help="start from the data set of a make_*_data.py script")
+    parser.add_argument('--coefficients', type=_floats, help="comma separated true coefficients")
+    parser.add_argument('--intercept', type=float)
+    parser.add_argument('--noise', type=float, help="standard deviation of the noise on y")
+    parser.add_argument('--low', type=_floats, help="comma separated lower bound of each feature")
+    parser.add_argument('--high', type=_floats, help="comma separated upper bound of each feature")
+    parser.add_argument('--rows', type=lambda text: int(float(text)), required=True)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--dtype', default='float32')
+    args = parser.parse_args()
+
+    spec = dict(PRESETS.get(args.preset, {}))
+    for name in ['coefficients', 'intercept', 'noise', 'low', 'high']:
+        if getattr(args, name) is not None:
+            spec[name] = getattr(args, name)
+    if 'coefficients' not in spec:
+        parser.error("either --preset or --coefficients is required")
+    spec['dtype'] = np.dtype(args.dtype).type
+
+    generate_file(args.out, args.rows, args.seed, args.chunk_rows, args.workers, **spec)
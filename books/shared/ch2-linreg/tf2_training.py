@@ -0,0 +1,69 @@
+import numpy as np
+import tensorflow as tf
+
+# TensorFlow 2 version of the chapter training loops. Instead of one
+# session.run (and one feed_dict copy of the data) per iteration, the data is
+# stored as constant tensors once, and chunks of many iterations run inside a
+# single traced tf.function. Only the loss and parameters at the end of each
+# chunk come back to Python.
+
+
+class LinearModel(tf.Module):
+    """ The model y = A x + b, with A of shape 1 x n """
+
+    def __init__(self, n):
+        self.A = tf.Variable(tf.random.normal((1, n)), name="A")
+        self.b = tf.Variable(tf.random.normal(()), name="b")
+
+    def __call__(self, x):
+        return tf.matmul(self.A, x) + self.b
+
+
+def sum_squared_error(y_predicted, y):
+    return tf.reduce_sum((y_predicted - y)**2)
+
+
+def make_train_chunk(model, optimizer, x, y, loss_fn=sum_squared_error):
+    """ Builds a tf.function that runs a given number of training steps
+    The number of steps is passed as a tensor, so chunks of different lengths
+    share a single trace. The function returns the loss of the last step.
+    """
+    @tf.function
+    def train_chunk(num_steps):
+        loss = tf.zeros((), dtype=y.dtype)
+        for _ in tf.range(num_steps):
+            with tf.GradientTape() as tape:
+                loss = loss_fn(model(x), y)
+            grads = tape.gradient(loss, model.trainable_variables)
+            optimizer.apply_gradients(zip(grads, model.trainable_variables))
+        return loss
+    return train_chunk
+
+
+def fit(X_data, y_data, optimizer, num_iters, steps_per_call=None, callback=None, loss_fn=sum_squared_error):
+    """ Trains a LinearModel on the given data
+    Args:
+        X_data: n x m array of inputs.
+        y_data: 1 x m array of outputs.
+        optimizer: a tf.keras optimizer.
+        num_iters: total number of training steps.
+        steps_per_call: number of steps run by each call into the traced
+            function, defaults to all of them at once.
+        callback: called as callback(t, loss, A, b) with numpy values after
+            each chunk, where t is the index of the last step of the chunk.
+        loss_fn: the loss, the summed squared error by default.
+    Returns:
+        The trained LinearModel.
+    """
+    x = tf.constant(np.asarray(X_data, dtype=np.float32))
+    y = tf.constant(np.asarray(y_data, dtype=np.float32))
+    model = LinearModel(x.shape[0])
+    train_chunk = make_train_chunk(model, optimizer, x, y, loss_fn)
+
+    steps_per_call = steps_per_call or num_iters
+    for start in range(0, num_iters, steps_per_call):
+        num_steps = min(steps_per_call, num_iters - start)
+        loss = train_chunk(tf.constant(num_steps))
+        if callback is not None:
+            callback(start + num_steps - 1, loss.numpy(), model.A.numpy(), model.b.numpy())
+    return model
@@ -0,0 +1,95 @@
+import json
+import os
+
+import numpy as np
+
+# A trajectory file is a directory holding one raw float64 file per column
+# (t, each parameter, loss and grad_norm) and a meta.json naming them.
+# Recording appends to each column file, so a run of any length is written
+# with a fixed size buffer, and readers can load (or memory-map) just the
+# columns they need.
+DEFAULT_BUFFER_ROWS = 65536
+
+
+class TrajectoryRecorder(object):
+    """ Records (t, params, loss, grad_norm) every stride steps of a training loop
+    Args:
+        path: directory to write the trajectory to, or None to keep it in
+            memory (growing the buffer geometrically as needed).
+        param_names: names of the parameters, for example ['A_0', 'A_1'].
+        stride: record one step out of every stride.
+        buffer_rows: rows buffered before being appended to the files.
+    """
+
+    def __init__(self, path, param_names, stride=1, buffer_rows=DEFAULT_BUFFER_ROWS):
+        self.path = path
+        self.columns = ['t'] + list(param_names) + ['loss', 'grad_norm']
+        self.stride = stride
+        self.buffer = np.empty((buffer_rows, len(self.columns)))
+        self.size = 0
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            with open(os.path.join(path, 'meta.json'), 'w') as f:
+                json.dump(dict(columns=self.columns, dtype='float64'), f)
+            # Start every column file empty
+            for name in self.columns:
+                open(self._column_path(name), 'wb').close()
+
+    def _column_path(self, name):
+        return os.path.join(self.path, name + '.f64')
+
+    def record(self, t, params, loss, grad_norm=np.nan):
+        """ Records step t, if it is a multiple of stride """
+        if t % self.stride != 0:
+            return
+        if self.size == len(self.buffer):
+            if self.path is None:
+                self.buffer = np.concatenate((self.buffer, np.empty_like(self.buffer)))
+            else:
+                self.flush()
+        row = self.buffer[self.size]
+        row[0] = t
+        row[1:-2] = np.ravel(params)
+        row[-2] = loss
+        row[-1] = grad_norm
+        self.size += 1
+
+    def flush(self):
+        """ Appends the buffered rows to the column files """
+        if self.path is None or self.size == 0:
+            return
+        for k, name in enumerate(self.columns):
+            with open(self._column_path(name), 'ab') as f:
+                self.buffer[:self.size, k].tofile(f)
+        self.size = 0
+
+    def close(self):
+        self.flush()
+
+    def to_array(self):
+        """ The in-memory trajectory, one row per recorded step, with self.columns as columns """
+        return self.buffer[:self.size].copy()
+
+
+def load_columns(path, columns=None, mmap=True):
+    """ Loads the named columns of a trajectory file (all by default) as a dict of arrays """
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    result = {}
+    for name in columns or meta['columns']:
+        column_path = os.path.join(path, name + '.f64')
+        if mmap and os.path.getsize(column_path) > 0:
+            result[name] = np.memmap(column_path, dtype=np.float64, mode='r')
+        else:
+            result[name] = np.fromfile(column_path, dtype=np.float64)
+    return result
+
+
+def load_run(path):
+    """ Loads a trajectory file in the layout of run1.npy: the parameters, then the loss """
+    with open(os.path.join(path, 'meta.json')) as f:
+        columns = json.load(f)['columns']
+    wanted = columns[1:-1]
+    data = load_columns(path, wanted, mmap=False)
+    return np.column_stack([data[name] for name in wanted])
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import shutil
+from collections import OrderedDict
+
+
+# Caches for the idris-runner function, kept for as long as the instance
+# stays warm. Entries are content addressed:
+#
+#   file set key  hash of every uploaded (path, content hash) pair, which
+#                 names the directory of .ibc files Idris wrote for them
+#   result key    the file set key plus the command, which names the
+#                 response sent back for it
+#
+# so identical playpen snippets share their entries whoever uploads them.
+
+
+def file_set_key(files):
+    """ Hashes a file set
+    Args:
+        files: iterable of (relative path, sha256 hex digest of the contents).
+    Returns:
+        Hex digest, independent of the order of files.
+    """
+    h = hashlib.sha256()
+    for path, digest in sorted(files):
+        h.update(path.encode('utf-8'))
+        h.update(b'\0')
+        h.update(digest.encode('ascii'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def result_key(files_key, command):
+    """ Hashes a file set key together with a command (a dict parsed from JSON) """
+    text = json.dumps(command, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256((files_key + '\0' + text).encode('utf-8')).hexdigest()
+
+
+def directory_size(path):
+    """ Total size in bytes of the files under path """
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class LRUCache(object):
+    """ A least recently used cache bounded by the total size of its values
+    Args:
+        max_bytes: the bound on the sum of the sizes given to put.
+        on_evict: optional function called with (key, value) of each entry
+            that is evicted or popped, but not when put replaces a key.
+    """
+
+    def __init__(self, max_bytes, on_evict=None):
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self.entries = OrderedDict()  # key: (value, size)
+        self.total_bytes = 0
+        self.pins = {}  # key: number of pin calls not yet matched by unpin
+
+    def get(self, key, default=None):
+        """ Returns the value of key, marking it as the most recently used """
+        if key not in self.entries:
+            return default
+        self.entries.move_to_end(key)
+        return self.entries[key][0]
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def pin(self, key):
+        """ Keeps key, whether or not it is in the cache yet, from being
+        evicted until unpin is called as many times
+        """
+        self.pins[key] = self.pins.get(key, 0) + 1
+
+    def unpin(self, key):
+        count = self.pins.pop(key, 0) - 1
+        if count > 0:
+            self.pins[key] = count
+
+    def put(self, key, value, size):
+        """ Inserts or replaces key, then evicts the least recently used
+        entries that are not pinned until the cache is within max_bytes. An
+        entry larger than max_bytes is not kept at all unless it is pinned,
+        and while entries are pinned the cache may stay above max_bytes.
+        """
+        if key in self.entries:
+            self.total_bytes -= self.entries.pop(key)[1]
+        self.entries[key] = (value, size)
+        self.total_bytes += size
+        for old_key in [k for k in self.entries if k not in self.pins]:
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._evict(old_key)
+
+    def pop(self, key):
+        """ Removes key, if present, calling on_evict """
+        if key in self.entries:
+            self._evict(key)
+
+    def _evict(self, key):
+        value, size = self.entries.pop(key)
+        self.total_bytes -= size
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+
+
+class IbcStore(object):
+    """ Directories of .ibc files, one per file set, under root, in an LRU by disk usage
+    Args:
+        root: the directory holding the cached directories.
+        max_bytes: the bound on their total size.
+        initial_bytes: the size assumed for a new directory before any was measured.
+    """
+
+    def __init__(self, root, max_bytes, initial_bytes=1024 * 1024):
+        self.root = root
+        # Exponential moving average of the measured sizes
+        self.average_bytes = initial_bytes
+        self.cache = LRUCache(max_bytes, on_evict=lambda key, path: shutil.rmtree(path, ignore_errors=True))
+        # Directories left over from an earlier instance are not tracked, so start clean
+        shutil.rmtree(root, ignore_errors=True)
+
+    def directory(self, files_key):
+        """ The .ibc directory of a file set, created if needed
+        The directory is pinned, so it is not evicted while Idris uses it,
+        until update is called, which must follow every call once Idris has
+        run. A new directory counts as the average size of the others until
+        then, so room is made for it before Idris writes to it.
+        """
+        path = os.path.join(self.root, files_key)
+        self.cache.pin(files_key)
+        if files_key not in self.cache:
+            os.makedirs(path, exist_ok=True)
+            self.cache.put(files_key, path, int(self.average_bytes))
+        else:
+            self.cache.get(files_key)
+        return path
+
+    def update(self, files_key):
+        """ Unpins a file set's directory and records its current size, evicting others if needed """
+        self.cache.unpin(files_key)
+        path = self.cache.get(files_key)
+        if path is not None:
+            size = directory_size(path)
+            self.average_bytes = 0.8 * self.average_bytes + 0.2 * size
+            self.cache.put(files_key, path, size)
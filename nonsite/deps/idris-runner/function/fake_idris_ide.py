@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+
+from repl_pool import Symbol, parse_sexp, format_sexp
+
+
+# A stand-in for idris --ide-mode, used by test_repl_pool.py where Idris is
+# not installed. It speaks the same framing (6 hex digits of length, then an
+# S-expression) and answers:
+#
+#   (:interpret ":cd dir")   by moving to dir
+#   (:load-file "f.idr")     with a (:warning ...) per line of f.idr holding
+#                            "warn", an :error if one holds "error", and
+#                            sleeping first if one holds "sleep"
+#   (:type-of "expr")        with "expr : Type", except for the expressions
+#                            "pid" (its process id), "loads" (the number of
+#                            files loaded so far), "nap" (answers after half
+#                            a second), "sleep" (never answers in time) and
+#                            "exit" (exits)
+#
+# Command line arguments, like the --ibcsubdir the workers add, are ignored.
+
+
+def send(message):
+    text = format_sexp(message) + '\n'
+    # The length counts characters, not bytes
+    sys.stdout.buffer.write(('%06x' % len(text) + text).encode('utf-8'))
+    sys.stdout.buffer.flush()
+
+
+def read_message():
+    header = sys.stdin.buffer.read(6)
+    if len(header) < 6:
+        return None
+    length = int(header, 16)
+    data = sys.stdin.buffer.read(length)
+    while len(data.decode('utf-8', 'ignore')) < length:
+        data += sys.stdin.buffer.read(1)
+    return parse_sexp(data.decode('utf-8'))
+
+
+def load_file(file_name):
+    with open(file_name) as f:
+        lines = f.read().split('\n')
+    if any('sleep' in line for line in lines):
+        time.sleep(60)
+    for number, line in enumerate(lines, 1):
+        if 'warn' in line:
+            send([Symbol(':warning'), [file_name, [number, 1], [number, len(line)], line, []]])
+    if any('error' in line for line in lines):
+        return [Symbol(':error'), "didn't load %s" % file_name]
+    return [Symbol(':ok'), []]
+
+
+def main():
+    loads = 0
+    send([Symbol(':protocol-version'), 1, 0])
+    while True:
+        message = read_message()
+        if message is None:
+            return
+        (command, *args), request_id = message
+        if command == ':interpret' and args[0].startswith(':cd '):
+            os.chdir(args[0][len(':cd '):])
+            result = [Symbol(':ok'), '']
+        elif command == ':load-file':
+            loads += 1
+            result = load_file(args[0])
+        elif command == ':type-of':
+            expr = args[0]
+            if expr == 'exit':
+                sys.exit(1)
+            elif expr == 'nap':
+                time.sleep(0.5)
+            elif expr == 'sleep':
+                time.sleep(60)
+            elif expr == 'pid':
+                expr = str(os.getpid())
+            elif expr == 'loads':
+                expr = str(loads)
+            send([Symbol(':output'), [Symbol(':ok'), [Symbol(':highlight-source'), []]], request_id])
+            result = [Symbol(':ok'), '%s : Type' % expr]
+        else:
+            result = [Symbol(':error'), 'unsupported %s' % command]
+        send([Symbol(':return'), result, request_id])
+
+
+if __name__ == '__main__':
+    main()
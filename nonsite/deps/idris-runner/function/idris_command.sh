@@ -1,4 +1,4 @@
 #!/bin/bash
 export PATH=$PATH:/srv/.cabal/bin;
 cd "$1"
-idris --ibcsubdir /tmp/ibc -p contrib --port none -q $2 # purposefully do NOT quote so the args are splatted
\ No newline at end of file
+idris --ibcsubdir "${IBC_DIR:-/tmp/ibc}" -p contrib --port none -q $2 # purposefully do NOT quote so the args are splatted
\ No newline at end of file
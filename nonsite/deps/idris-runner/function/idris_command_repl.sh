@@ -2,4 +2,4 @@
 export PATH=$PATH:/srv/.cabal/bin;
 cd "$1"
 # purposefully do NOT quote $2 so the args are splatted:
-echo "$3" | idris --ibcsubdir /tmp/ibc -p contrib --port none --nobanner -q $2 
\ No newline at end of file
+echo "$3" | idris --ibcsubdir "${IBC_DIR:-/tmp/ibc}" -p contrib --port none --nobanner -q $2 
\ No newline at end of file
@@ -0,0 +1,84 @@
+import asyncio
+import math
+import threading
+import time
+
+
+# Runs the compile jobs of the idris-runner function on an asyncio event
+# loop, in a thread of its own so the (synchronous) Cloud Functions handler
+# can hand jobs to it:
+#
+# - at most max_running jobs run at once, each in a thread of the loop's
+#   executor, and at most max_waiting more wait for their turn. Anything
+#   beyond that is refused with QueueFull, which the handler turns into a
+#   429 with a Retry-After estimated from recent job durations
+# - jobs are keyed, and a job submitted while one with the same key is
+#   queued or running just waits for that one's result
+
+
+class QueueFull(Exception):
+    """ Raised when too many jobs are already running or waiting
+    Attributes:
+        retry_after: suggested number of seconds before trying again.
+    """
+
+    def __init__(self, retry_after):
+        Exception.__init__(self, "too many jobs, retry after %d s" % retry_after)
+        self.retry_after = retry_after
+
+
+class JobQueue(object):
+    """ A bounded, coalescing queue of blocking jobs
+    Args:
+        max_running: number of jobs run at once.
+        max_waiting: number of jobs allowed to wait on top of those.
+        initial_duration: job duration in seconds assumed before any finished.
+    """
+
+    def __init__(self, max_running, max_waiting, initial_duration=5.0):
+        self.max_running = max_running
+        self.max_waiting = max_waiting
+        self.average_duration = initial_duration
+        self.in_flight = {}  # key: asyncio.Future of the job's result
+        self.loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=self.loop.run_forever, name='job-queue', daemon=True)
+        thread.start()
+        self.slots = asyncio.run_coroutine_threadsafe(self._make_semaphore(), self.loop).result()
+
+    async def _make_semaphore(self):
+        # Created on the loop, so it belongs to it
+        return asyncio.Semaphore(self.max_running)
+
+    def retry_after(self):
+        """ Rough number of seconds until a slot frees up, at least 1 """
+        backlog = max(len(self.in_flight) - self.max_running + 1, 1)
+        return max(1, int(math.ceil(self.average_duration * backlog / self.max_running)))
+
+    async def _run_job(self, job):
+        async with self.slots:
+            start = time.monotonic()
+            try:
+                return await self.loop.run_in_executor(None, job)
+            finally:
+                # Exponential moving average of the durations
+                self.average_duration = 0.8 * self.average_duration + 0.2 * (time.monotonic() - start)
+
+    async def submit(self, key, job):
+        """ Runs job() unless a job with the same key is in flight, and returns its result
+        Raises:
+            QueueFull if max_running + max_waiting jobs are already in flight.
+            Whatever job raises, to every caller sharing it.
+        """
+        future = self.in_flight.get(key)
+        if future is None:
+            if len(self.in_flight) >= self.max_running + self.max_waiting:
+                raise QueueFull(self.retry_after())
+            future = asyncio.ensure_future(self._run_job(job))
+            self.in_flight[key] = future
+            future.add_done_callback(lambda done: self.in_flight.pop(key, None))
+        # shield, so one caller giving up doesn't cancel the job of the others
+        return await asyncio.shield(future)
+
+    def run(self, key, job):
+        """ submit, from a thread other than the loop's, blocking until the result is ready """
+        return asyncio.run_coroutine_threadsafe(self.submit(key, job), self.loop).result()
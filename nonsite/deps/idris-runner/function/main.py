@@ -1,17 +1,377 @@
+import hashlib
+import json
 import os
+import shutil
+import subprocess
 import tempfile
+import threading
+import flask
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
+import compile_cache
+import job_queue
+import repl_pool
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Uploads are copied this many bytes at a time
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Total size allowed for the files of one request
+MAX_UPLOAD_BYTES = 8 * 1024 * 1024
+# Seconds an Idris run may take
+COMMAND_TIMEOUT = 60
+# Bounds of the caches, which live in memory (the temp directory included)
+MAX_RESULT_CACHE_BYTES = 4 * 1024 * 1024
+MAX_IBC_CACHE_BYTES = 64 * 1024 * 1024
+# Number of warm Idris processes answering the interactive commands, 0 to
+# run idris_command_repl.sh for each of them instead
+REPL_POOL_SIZE = 2
+# Requests served by a warm Idris process before it is replaced
+REPL_MAX_USES = 100
+# Idris runs allowed at once, and how many more may wait before requests
+# are turned away with a 429
+MAX_COMPILE_JOBS = 2
+MAX_WAITING_JOBS = 8
+# Commands allowed in one batch request
+MAX_BATCH_COMMANDS = 100
+
+# Responses by result key, and .ibc directories by file set key, see compile_cache.py
+result_cache = compile_cache.LRUCache(MAX_RESULT_CACHE_BYTES)
+ibc_store = compile_cache.IbcStore(os.path.join(tempfile.gettempdir(), 'idris-ibc'), MAX_IBC_CACHE_BYTES)
+# Jobs run in several threads, which share the caches
+cache_lock = threading.Lock()
+# Idris runs on the same .ibc directory take turns: [lock, number of jobs
+# holding or waiting for it] by file set key, guarded by cache_lock
+ibc_locks = {}
+# The Idris runs, see job_queue.py
+compile_jobs = job_queue.JobQueue(MAX_COMPILE_JOBS, MAX_WAITING_JOBS)
+# The warm Idris processes, see repl_pool.py
+repl_workers = None
+if REPL_POOL_SIZE > 0:
+    repl_workers = repl_pool.ReplPool(REPL_POOL_SIZE, timeout=COMMAND_TIMEOUT, max_uses=REPL_MAX_USES)
+
+
+class UploadTooLarge(Exception):
+    pass
+
 
 # Helper function that computes the filepath to save files to
-def get_file_path(filename):
-    # Note: tempfile.gettempdir() points to an in-memory file system
+def get_file_path(directory, filename):
+    """ Maps an uploaded file name to a path inside directory
+    Args:
+        directory: the scratch directory of the request.
+        filename: the name sent by the client, which may contain
+            subdirectories like "Data/Vect.idr" for multi-file projects.
+    Returns:
+        The path, which never escapes directory.
+    """
+    parts = [secure_filename(part) for part in filename.replace('\\', '/').split('/')]
+    parts = [part for part in parts if part]
+    if not parts:
+        raise ValueError("invalid file name %r" % filename)
+    return os.path.join(directory, *parts)
+
+
+def upload_name(field_name, file):
+    """ The name of an uploaded file: the playpen sends every file as files[],
+    with its path as the file name
+    """
+    return file.filename or field_name
+
+
+def hash_uploads(files):
+    """ Hashes every uploaded file of a request in UPLOAD_CHUNK_SIZE chunks, without
+    writing anything, so cached and coalesced requests never touch the disk
+    Args:
+        files (werkzeug.datastructures.MultiDict): request.files.
+    Returns:
+        List of (name relative to the scratch directory, sha256 hex digest).
+    Raises:
+        UploadTooLarge if the files add up to more than MAX_UPLOAD_BYTES,
+        ValueError if a name is invalid.
+    """
+    hashed = []
+    total = 0
+    for file_name, file in files.items(multi=True):
+        h = hashlib.sha256()
+        while True:
+            chunk = file.stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            total += len(chunk)
+            if total > MAX_UPLOAD_BYTES:
+                raise UploadTooLarge()
+            h.update(chunk)
+        file.stream.seek(0)
+        hashed.append((get_file_path('', upload_name(file_name, file)), h.hexdigest()))
+    return hashed
+
+
+def save_upload(file, file_path):
+    """ Streams an uploaded file to file_path in UPLOAD_CHUNK_SIZE chunks
+    Args:
+        file (werkzeug.datastructures.FileStorage): The uploaded file.
+        file_path: where to write it.
+    """
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'wb') as out:
+        shutil.copyfileobj(file.stream, out, UPLOAD_CHUNK_SIZE)
+    # The .ibc directory is keyed on the contents of every uploaded file (see
+    # compile_cache.py), so the .ibc files in it are always those of this
+    # exact source. But Idris decides whether an .ibc file is stale only by
+    # comparing its modification time with the source's, and a fresh upload
+    # is always newer: date the source in the past so that Idris reuses
+    # them. Without this every run rebuilds them, which is slower but correct.
+    os.utime(file_path, (0, 0))
+
+
+def save_uploads(files, directory):
+    """ Saves every uploaded file of a request under directory, once hash_uploads has checked them
+    Args:
+        files (werkzeug.datastructures.MultiDict): request.files.
+        directory: the scratch directory of the request.
+    """
+    for file_name, file in files.items(multi=True):
+        save_upload(file, get_file_path(directory, upload_name(file_name, file)))
+
+
+def line_number(value):
+    """ The line number n of a command as an int, which may be sent as a string of digits, or None """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value if value >= 0 else None
+    if isinstance(value, str) and value.isascii() and value.isdigit():
+        return int(value)
+    return None
+
+
+def plain_file_name(value):
+    """ Whether the file of a command is a plain relative name, which Idris
+    can't take for an option and which stays inside the scratch directory
+    """
+    if not isinstance(value, str) or not value:
+        return False
+    if value.startswith('-') or value.startswith('/') or any(c.isspace() for c in value):
+        return False
+    return '..' not in value.replace('\\', '/').split('/')
+
+
+def build_command(command):
+    """ Translates a playpen command into Idris arguments, like file-processing.js
+    Args:
+        command: dict parsed from the 'command' field, with an action of
+            check, typeof, addclause or casesplit and its arguments.
+    Returns:
+        (idris arguments, REPL command or None), or None if the command is
+        invalid, including when its line number n is not an integer or its
+        file not a plain relative name (see plain_file_name).
+    """
+    if not isinstance(command, dict):
+        return None
+    if 'n' in command and line_number(command['n']) is None:
+        return None
+    if 'file' in command and not plain_file_name(command['file']):
+        return None
+    action = command.get('action')
+    if action == 'check' and 'file' in command:
+        return '--check %s' % command['file'], None
+    elif action == 'typeof' and 'file' in command and 'expr' in command:
+        return '%s' % command['file'], ':t %s' % command['expr']
+    elif action == 'addclause' and 'file' in command and 'f' in command and 'n' in command:
+        return '%s' % command['file'], ':ac %s %s' % (command['n'], command['f'])
+    elif action == 'casesplit' and 'file' in command and 'x' in command and 'n' in command:
+        return '%s' % command['file'], ':cs %s %s' % (command['n'], command['x'])
+    return None
+
+
+def ide_mode_command(command):
+    """ The IDE mode form of an interactive command (see repl_pool.py), or None for check """
+    Symbol = repl_pool.Symbol
+    if command['action'] == 'typeof':
+        return [Symbol(':type-of'), '%s' % command['expr']]
+    elif command['action'] == 'addclause':
+        return [Symbol(':add-clause'), line_number(command['n']), '%s' % command['f']]
+    elif command['action'] == 'casesplit':
+        return [Symbol(':case-split'), line_number(command['n']), '%s' % command['x']]
+    return None
+
+
+def format_result(command, stdout):
+    """ Builds the JSON response the playpen expects from the output of Idris """
+    stdout = stdout.strip()
+    if command['action'] == 'addclause' and len(stdout.split('\n')) == 1:
+        result = {'displayAction': 'insert', 'toInsert': stdout, 'line': command['n']}
+    elif command['action'] == 'casesplit':
+        result = {'displayAction': 'replace', 'toReplace': stdout, 'line': command['n']}
+    else:
+        result = {'displayAction': 'showtext', 'text': stdout}
+    return json.dumps(result)
+
+
+def run_command(command, source_dir, ibc_dir, files_key):
+    """ Runs a command on a warm Idris process, or with idris_command.sh or idris_command_repl.sh
+    Args:
+        command: a command accepted by build_command.
+        source_dir: the directory holding the uploaded files.
+        ibc_dir: the directory Idris reads and writes .ibc files in.
+        files_key: the file set key of the uploaded files.
+    Returns:
+        (response text, the command to cache it under, or None if Idris
+        didn't run and the response must not be cached).
+    Raises:
+        subprocess.TimeoutExpired or repl_pool.ReplTimeout if Idris takes
+        longer than COMMAND_TIMEOUT.
+    """
+    ide_command = ide_mode_command(command)
+    if repl_workers is not None and ide_command is not None:
+        try:
+            answer = repl_workers.run(source_dir, command['file'], files_key, ide_command)
+            return format_result(command, answer), command
+        except repl_pool.ReplTimeout:
+            raise
+        except repl_pool.ReplError:
+            # The worker has been replaced, answer this one the slow way
+            pass
+    return run_script(command, source_dir, ibc_dir)
+
+
+def session_check(command):
+    """ The command a check answered in a warm Idris session is cached under.
+    Loading the file prints the warnings of IDE mode rather than the output of
+    idris --check, so the two answers are kept apart.
+    """
+    return dict(command, session=True)
+
+
+def run_commands(commands, source_dir, ibc_dir, files_key):
+    """ Runs several commands on one file set. When there are warm processes,
+    they all share a single Idris session, so each file is loaded once, and
+    checks are answered by loading.
+    Args:
+        commands: list of commands accepted by build_command.
+        source_dir, ibc_dir, files_key: as for run_command.
+    Returns:
+        The list of (response text, command to cache it under or None), in order.
+    """
+    if len(commands) > 1 and repl_workers is not None:
+        requests = [(command['file'], ide_mode_command(command)) for command in commands]
+        try:
+            answers = repl_workers.run_many(source_dir, files_key, requests)
+        except repl_pool.ReplTimeout:
+            raise
+        except repl_pool.ReplError:
+            # The worker has been replaced, answer them one at a time
+            pass
+        else:
+            return [(format_result(command, answer),
+                     command if ide_mode_command(command) is not None else session_check(command))
+                    for command, answer in zip(commands, answers)]
+    return [run_command(command, source_dir, ibc_dir, files_key) for command in commands]
+
+
+def run_script(command, source_dir, ibc_dir):
+    """ Runs a command with idris_command.sh or idris_command_repl.sh, see run_command """
+    idris_args, repl_command = build_command(command)
+    if repl_command is None:
+        args = [os.path.join(HERE, 'idris_command.sh'), source_dir, idris_args]
+    else:
+        args = [os.path.join(HERE, 'idris_command_repl.sh'), source_dir, idris_args, repl_command]
+    process = subprocess.run(args, cwd=HERE, env=dict(os.environ, IBC_DIR=ibc_dir), stdout=subprocess.PIPE,
+                             stderr=subprocess.DEVNULL, universal_newlines=True, timeout=COMMAND_TIMEOUT)
+    # Idris itself exits with 0, or 1 for errors in the source. bash exits
+    # with 126 or 127 when it couldn't run idris, and 128 + n when idris was
+    # killed by signal n: those answers say nothing about the source
+    ran = 0 <= process.returncode < 126
+    return format_result(command, process.stdout), command if ran else None
+
+
+def compile_job(files, commands, files_key):
+    """ Saves the uploads and runs the commands on them, caching the responses
+    Args:
+        files (werkzeug.datastructures.MultiDict): request.files.
+        commands: list of commands accepted by build_command.
+        files_key: the file set key of the request.
+    Returns:
+        The list of response texts.
+    """
+    # Each job gets its own scratch directory, removed however the job
+    # ends. Note: tempfile.gettempdir() points to an in-memory file system
     # on GCF. Thus, any files in it must fit in the instance's memory.
-    file_name = secure_filename(filename)
-    return os.path.join(tempfile.gettempdir(), file_name)
+    scratch_dir = tempfile.mkdtemp(prefix='idris-')
+    with cache_lock:
+        ibc_lock = ibc_locks.setdefault(files_key, [threading.Lock(), 0])
+        ibc_lock[1] += 1
+    try:
+        save_uploads(files, scratch_dir)
+        # Run Idris, reusing the .ibc files of the same file set, which stay
+        # pinned in the store until update. Jobs with other commands on the
+        # same files wait for this one, so only one Idris writes them at a time
+        with ibc_lock[0]:
+            with cache_lock:
+                ibc_dir = ibc_store.directory(files_key)
+            try:
+                results = run_commands(commands, scratch_dir, ibc_dir, files_key)
+            finally:
+                with cache_lock:
+                    ibc_store.update(files_key)
+        with cache_lock:
+            for response, cache_as in results:
+                if cache_as is not None:
+                    result_cache.put(compile_cache.result_key(files_key, cache_as), response, len(response))
+        return [response for response, cache_as in results]
+    finally:
+        with cache_lock:
+            ibc_lock[1] -= 1
+            if ibc_lock[1] == 0:
+                del ibc_locks[files_key]
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def check_files(commands, hashed):
+    """ Checks that the file of every command is one of the uploaded files
+    Args:
+        commands: list of commands accepted by build_command.
+        hashed: the list returned by hash_uploads.
+    Raises:
+        ValueError with a message for the client otherwise.
+    """
+    names = set(name for name, digest in hashed)
+    for command in commands:
+        if command['file'] not in names:
+            raise ValueError('Error: %s is not an uploaded file' % json.dumps(command['file']))
+
+
+def parse_commands(fields):
+    """ Reads the commands of a request
+    Args:
+        fields: the form fields, with either 'command', one command as JSON,
+            or 'commands', a JSON list of them to run on the same files.
+    Returns:
+        (list of commands, whether it is a batch).
+    Raises:
+        ValueError with a message for the client if a command is invalid.
+    """
+    batch = 'commands' in fields
+    try:
+        if batch:
+            commands = json.loads(fields['commands'])
+        else:
+            commands = [json.loads(fields.get('command', 'null'))]
+    except ValueError:
+        commands = None
+    if not isinstance(commands, list) or not commands:
+        raise ValueError('Error: unrecognized command %s' % fields.get('commands', fields.get('command')))
+    if len(commands) > MAX_BATCH_COMMANDS:
+        raise ValueError('Error: more than %d commands' % MAX_BATCH_COMMANDS)
+    for command in commands:
+        if build_command(command) is None:
+            raise ValueError('Error: unrecognized command %s' % json.dumps(command))
+    return commands, batch
 
 
 def idrisrunner(request):
     """ Parses a 'multipart/form-data' upload request
+    The response is the result of the command, or for a batch (a 'commands'
+    field) the JSON list of the results of each command, in order.
     Args:
         request (flask.Request): The request object.
     Returns:
@@ -37,23 +397,61 @@ def idrisrunner(request):
         'Access-Control-Allow-Origin': '*'
     }
 
-    response = "Received stuff:"
+    # Refuse oversized requests before the form is parsed at all
+    if request.content_length is not None and request.content_length > MAX_UPLOAD_BYTES:
+        return ('Upload too large', 413, headers)
+
+    # A chunked body has no Content-Length to check: with MAX_CONTENT_LENGTH
+    # set, werkzeug stops reading it once it is over the limit
+    flask.current_app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES
+
     # This code will process each non-file field in the form
-    fields = {}
-    data = request.form.to_dict()
-    for field in data:
-        fields[field] = data[field]
-        response += 'Processed field: %s' % field
+    try:
+        fields = request.form.to_dict()
+    except RequestEntityTooLarge:
+        return ('Upload too large', 413, headers)
+    try:
+        commands, batch = parse_commands(fields)
+    except ValueError as e:
+        return (str(e), 400 if 'commands' in fields else 200, headers)
 
     # This code will process each file uploaded
-    files = request.files.to_dict()
-    for file_name, file in files.items():
-        file.save(get_file_path(file_name))
-        response += 'Processed file: %s' % file_name
+    files = request.files
+    try:
+        hashed = hash_uploads(files)
+    except UploadTooLarge:
+        return ('Upload too large', 413, headers)
+    except ValueError as e:
+        return (str(e), 400, headers)
+    try:
+        check_files(commands, hashed)
+    except ValueError as e:
+        return (str(e), 400 if batch else 200, headers)
+    files_key = compile_cache.file_set_key(hashed)
+
+    # Identical uploads and command: answer from the cache. A check in a
+    # batch may also have been answered in a warm session (see run_commands)
+    with cache_lock:
+        responses = [result_cache.get(compile_cache.result_key(files_key, command)) for command in commands]
+        if batch:
+            responses = [result_cache.get(compile_cache.result_key(files_key, session_check(command)))
+                         if response is None and command['action'] == 'check' else response
+                         for command, response in zip(commands, responses)]
+    missing = [command for command, response in zip(commands, responses) if response is None]
 
-    # Clear temporary directory
-    for file_name in files:
-        file_path = get_file_path(file_name)
-        os.remove(file_path)
+    # Otherwise queue a job for the rest, or share the result of an identical one in flight
+    if missing:
+        key = compile_cache.result_key(files_key, missing)
+        try:
+            answers = iter(compile_jobs.run(key, lambda: compile_job(files, missing, files_key)))
+        except job_queue.QueueFull as e:
+            headers['Retry-After'] = str(e.retry_after)
+            return ('Too many requests', 429, headers)
+        except (subprocess.TimeoutExpired, repl_pool.ReplTimeout):
+            return ('Error: timed out', 504, headers)
+        responses = [next(answers) if response is None else response for response in responses]
 
-    return (response, 200, headers)
\ No newline at end of file
+    if batch:
+        # Every response is already JSON
+        return ('[%s]' % ','.join(responses), 200, headers)
+    return (responses[0], 200, headers)
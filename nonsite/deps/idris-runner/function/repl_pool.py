@@ -0,0 +1,295 @@
+import os
+import re
+import select
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+
+# A pool of long-lived Idris processes in IDE mode (idris --ide-mode), so the
+# interactive commands of the playpen (:t, :ac, :cs) don't pay for starting
+# Idris and loading the Prelude each time. IDE mode messages are
+# S-expressions, each preceded by its length as 6 hex digits:
+#
+#   000018((:type-of "main") 2)
+#
+# and Idris answers a request with any number of (:output ...),
+# (:write-string ...) or (:warning ...) messages, then (:return ... id).
+#
+# A worker remembers which file set it has loaded, and the pool hands a
+# request to a worker that already has its file set when there is one, so
+# commands on the same snippet skip loading it again. Workers that time out
+# or misbehave are killed, and every worker is replaced after max_uses
+# requests.
+
+IDRIS_PATH = '/srv/.cabal/bin'
+IDRIS_ARGS = ['idris', '--ide-mode', '-p', 'contrib', '--nobanner']
+
+
+class ReplError(Exception):
+    pass
+
+
+class ReplTimeout(ReplError):
+    pass
+
+
+### S-expressions ###
+
+class Symbol(str):
+    """ A symbol, like :ok, as opposed to a string """
+    pass
+
+
+_TOKEN = re.compile(r'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|([^\s()"]+))', re.S)
+
+
+def parse_sexp(text):
+    """ Parses one S-expression into lists, strings, ints and Symbols """
+    stack = [[]]
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise ReplError("bad S-expression %r" % text)
+        position = match.end()
+        open_paren, close_paren, string, atom = match.groups()
+        if open_paren:
+            stack.append([])
+        elif close_paren:
+            if len(stack) < 2:
+                raise ReplError("bad S-expression %r" % text)
+            done = stack.pop()
+            stack[-1].append(done)
+        elif string is not None:
+            stack[-1].append(re.sub(r'\\(.)', r'\1', string))
+        elif re.match(r'-?\d+$', atom):
+            stack[-1].append(int(atom))
+        else:
+            stack[-1].append(Symbol(atom))
+    if len(stack) != 1 or len(stack[0]) != 1:
+        raise ReplError("bad S-expression %r" % text)
+    return stack[0][0]
+
+
+def format_sexp(value):
+    """ The inverse of parse_sexp """
+    if isinstance(value, Symbol):
+        return value
+    elif isinstance(value, str):
+        return '"%s"' % value.replace('\\', '\\\\').replace('"', '\\"')
+    elif isinstance(value, int):
+        return str(value)
+    return '(%s)' % ' '.join(format_sexp(item) for item in value)
+
+
+### Workers ###
+
+def format_warning(warning):
+    """ Formats the payload of a (:warning ...) message like the command line does """
+    try:
+        file_name, start, end, message = warning[:4]
+        return '%s:%d:%d-%d:\n%s' % (file_name, start[0], start[1], end[1], message)
+    except (TypeError, ValueError, IndexError):
+        return format_sexp(warning)
+
+
+class ReplWorker(object):
+    """ One Idris process in IDE mode
+    Args:
+        args: the command line starting it.
+        work_dir: a directory the worker may write its .ibc files to.
+    """
+
+    def __init__(self, args, work_dir):
+        self.work_dir = work_dir
+        env = dict(os.environ, PATH=os.environ.get('PATH', '') + os.pathsep + IDRIS_PATH)
+        self.process = subprocess.Popen(args + ['--ibcsubdir', os.path.join(work_dir, 'ibc')], cwd=work_dir, env=env,
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                        bufsize=0)
+        self.buffer = b''
+        self.next_id = 1
+        self.uses = 0
+        self.loaded = None  # (file set key, file) currently loaded
+        self.load_output = []  # and what loading it printed
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def close(self):
+        if self.alive():
+            self.process.kill()
+        self.process.wait()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def _read_exact(self, size, deadline):
+        fd = self.process.stdout.fileno()
+        while len(self.buffer) < size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ReplTimeout("Idris did not answer in time")
+            if not select.select([fd], [], [], remaining)[0]:
+                continue
+            data = os.read(fd, 65536)
+            if not data:
+                raise ReplError("Idris exited")
+            self.buffer += data
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def _read_message(self, deadline):
+        length = int(self._read_exact(6, deadline), 16)
+        data = self._read_exact(length, deadline)
+        # The length counts characters, so read on while any is more than a byte
+        while len(data.decode('utf-8', 'ignore')) < length:
+            data += self._read_exact(1, deadline)
+        return parse_sexp(data.decode('utf-8'))
+
+    def call(self, command, deadline):
+        """ Sends one command and waits for its answer
+        Args:
+            command: the command as a list, e.g. [Symbol(':type-of'), 'main'].
+            deadline: the time.monotonic() by which the answer must have come.
+        Returns:
+            (ok, payload, output), with ok whether Idris returned :ok, payload
+            the rest of its :ok or :error, and output a list of the text of
+            the messages printed meanwhile.
+        """
+        request_id = self.next_id
+        self.next_id += 1
+        message = format_sexp([command, request_id]) + '\n'
+        try:
+            self.process.stdin.write(('%06x' % len(message) + message).encode('utf-8'))
+        except OSError:
+            raise ReplError("Idris exited")
+
+        output = []
+        while True:
+            reply = self._read_message(deadline)
+            if not isinstance(reply, list) or not reply:
+                continue
+            kind = reply[0]
+            if kind == ':return' and reply[-1] == request_id:
+                result = reply[1]
+                return result[0] == ':ok', result[1:], output
+            elif kind == ':warning' and len(reply) > 1:
+                output.append(format_warning(reply[1]))
+            elif kind in (':write-string', ':output') and len(reply) > 1 and isinstance(reply[1], str):
+                output.append(reply[1])
+
+    def load(self, directory, file_name, files_key, deadline):
+        """ Makes directory the working directory, and loads file_name unless
+        the same file of the same file set is already loaded
+        Returns:
+            (ok, output) of loading, the output of the earlier load if it was
+            already loaded.
+        """
+        # An identical file set may have been uploaded to another directory,
+        # so always move to this one: some commands read the source again
+        ok, payload, output = self.call([Symbol(':interpret'), ':cd %s' % directory], deadline)
+        if self.loaded == (files_key, file_name):
+            return True, list(self.load_output)
+        self.loaded = None
+        ok, payload, output = self.call([Symbol(':load-file'), file_name], deadline)
+        if ok:
+            self.loaded = (files_key, file_name)
+            self.load_output = list(output)
+        elif payload and isinstance(payload[0], str):
+            output.append(payload[0])
+        return ok, output
+
+
+class ReplPool(object):
+    """ Up to size ReplWorkers, started when first needed
+    Args:
+        size: the maximum number of workers, and so of concurrent requests.
+        args: the command line of a worker, IDRIS_ARGS by default.
+        timeout: seconds allowed for each request, however many commands it holds.
+        max_uses: requests served by a worker before it is replaced.
+    """
+
+    def __init__(self, size, args=None, timeout=30, max_uses=100):
+        self.args = args or IDRIS_ARGS
+        self.timeout = timeout
+        self.max_uses = max_uses
+        self.idle = []
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(size)
+
+    def _acquire(self, files_key):
+        self.slots.acquire()
+        with self.lock:
+            for worker in self.idle:
+                if worker.loaded is not None and worker.loaded[0] == files_key:
+                    self.idle.remove(worker)
+                    return worker
+            if self.idle:
+                return self.idle.pop()
+        try:
+            return ReplWorker(self.args, tempfile.mkdtemp(prefix='idris-repl-'))
+        except OSError as e:
+            self.slots.release()
+            raise ReplError("could not start Idris: %s" % e)
+
+    def _release(self, worker, healthy):
+        worker.uses += 1
+        if healthy and worker.alive() and worker.uses < self.max_uses:
+            with self.lock:
+                self.idle.append(worker)
+        else:
+            worker.close()
+        self.slots.release()
+
+    def run(self, directory, file_name, files_key, command):
+        """ Loads file_name of the file set in directory and runs a command on it
+        Args:
+            directory: the directory holding the uploaded files.
+            file_name: the file to load, relative to directory.
+            files_key: the file set key of compile_cache.file_set_key.
+            command: the IDE mode command, e.g. [Symbol(':type-of'), 'main'],
+                or None to only load the file.
+        Returns:
+            The text Idris answered, or its errors.
+        Raises:
+            ReplTimeout if the worker took longer than timeout, ReplError if
+            it failed in another way.
+        """
+        return self.run_many(directory, files_key, [(file_name, command)])[0]
+
+    def run_many(self, directory, files_key, requests):
+        """ Like run, for several commands on one file set, all answered by a single worker
+        Args:
+            directory, files_key: as for run.
+            requests: list of (file_name, command) pairs, as for run.
+        Returns:
+            The list of answers, in order.
+        """
+        worker = self._acquire(files_key)
+        # One deadline for the whole request, so a batch holds the worker no
+        # longer than a single command may
+        deadline = time.monotonic() + self.timeout
+        healthy = False
+        try:
+            answers = []
+            for file_name, command in requests:
+                ok, output = worker.load(directory, file_name, files_key, deadline)
+                if ok and command is not None:
+                    # Only the answer, what loading printed belongs to checking
+                    ok, payload, output = worker.call(command, deadline)
+                    if payload and isinstance(payload[0], str):
+                        output.append(payload[0])
+                answers.append('\n'.join(output))
+            healthy = True
+            return answers
+        finally:
+            self._release(worker, healthy)
+
+    def close(self):
+        """ Stops the idle workers """
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for worker in idle:
+            worker.close()
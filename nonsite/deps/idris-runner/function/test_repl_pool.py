@@ -0,0 +1,144 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import repl_pool
+from repl_pool import Symbol, parse_sexp, format_sexp
+
+# Checks repl_pool.py against fake_idris_ide.py, so it runs without Idris:
+#
+#   python test_repl_pool.py
+#
+# (pytest collects the same functions.)
+
+FAKE_IDRIS = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_idris_ide.py')]
+
+
+def make_files(**sources):
+    directory = tempfile.mkdtemp(prefix='idris-test-')
+    for name, text in sources.items():
+        with open(os.path.join(directory, name + '.idr'), 'w') as f:
+            f.write(text)
+    return directory
+
+
+def type_of(expr):
+    return [Symbol(':type-of'), expr]
+
+
+def test_sexp():
+    text = '(:return (:ok "a \\"quoted\\" \\\\ string" (1 -2)) 3)'
+    value = parse_sexp(text)
+    assert value == [':return', [':ok', 'a "quoted" \\ string', [1, -2]], 3]
+    assert isinstance(value[0], Symbol) and not isinstance(value[1][1], Symbol)
+    assert format_sexp(value) == text
+    assert parse_sexp(format_sexp(['é ∀', Symbol(':x'), []])) == ['é ∀', ':x', []]
+    for bad in ('(a', 'a)', '(a) (b)', ''):
+        try:
+            parse_sexp(bad)
+        except repl_pool.ReplError:
+            pass
+        else:
+            raise AssertionError("parsed %r" % bad)
+
+
+def test_run():
+    directory = make_files(Main='main : IO ()\n-- warn here\n', Bad='error\n')
+    pool = repl_pool.ReplPool(1, args=FAKE_IDRIS, timeout=5)
+    try:
+        # Checking is loading, and answers with the warnings
+        assert pool.run(directory, 'Main.idr', 'k', None) == 'Main.idr:2:1-12:\n-- warn here'
+        # A command answers only itself, and the file is not loaded again
+        assert pool.run(directory, 'Main.idr', 'k', type_of('main')) == 'main : Type'
+        assert pool.run(directory, 'Main.idr', 'k', type_of('loads')) == '1 : Type'
+        # Another file set, or another file, is loaded
+        assert pool.run(directory, 'Main.idr', 'other', type_of('loads')) == '2 : Type'
+        assert pool.run(directory, 'Bad.idr', 'other', None) == "didn't load Bad.idr"
+        # Lengths count characters
+        assert pool.run(directory, 'Main.idr', 'k', type_of('∀é')) == '∀é : Type'
+        answers = pool.run_many(directory, 'k', [('Main.idr', None), ('Main.idr', type_of('main'))])
+        assert answers == ['Main.idr:2:1-12:\n-- warn here', 'main : Type']
+    finally:
+        pool.close()
+        shutil.rmtree(directory)
+
+
+def test_timeout():
+    directory = make_files(Main='main : IO ()\n', Slow='sleep\n')
+    pool = repl_pool.ReplPool(1, args=FAKE_IDRIS, timeout=1)
+    try:
+        pid = pool.run(directory, 'Main.idr', 'k', type_of('pid'))
+        for file_name, command in (('Main.idr', type_of('sleep')), ('Slow.idr', None)):
+            try:
+                pool.run(directory, file_name, 'k', command)
+            except repl_pool.ReplTimeout:
+                pass
+            else:
+                raise AssertionError("no timeout")
+            # The worker that timed out was killed, and a new one answers
+            assert not pool.idle
+            new_pid = pool.run(directory, 'Main.idr', 'k', type_of('pid'))
+            assert new_pid != pid
+            pid = new_pid
+    finally:
+        pool.close()
+        shutil.rmtree(directory)
+
+
+def test_batch_timeout():
+    directory = make_files(Main='main : IO ()\n')
+    pool = repl_pool.ReplPool(1, args=FAKE_IDRIS, timeout=1)
+    try:
+        # Each command answers in time, but the batch as a whole doesn't
+        assert pool.run(directory, 'Main.idr', 'k', type_of('nap')) == 'nap : Type'
+        try:
+            pool.run_many(directory, 'k', [('Main.idr', type_of('nap'))] * 3)
+        except repl_pool.ReplTimeout:
+            pass
+        else:
+            raise AssertionError("no timeout")
+        assert not pool.idle
+    finally:
+        pool.close()
+        shutil.rmtree(directory)
+
+
+def test_exit():
+    directory = make_files(Main='main : IO ()\n')
+    pool = repl_pool.ReplPool(1, args=FAKE_IDRIS, timeout=5)
+    try:
+        try:
+            pool.run(directory, 'Main.idr', 'k', type_of('exit'))
+        except repl_pool.ReplTimeout:
+            raise AssertionError("exiting is not a timeout")
+        except repl_pool.ReplError:
+            pass
+        else:
+            raise AssertionError("no error")
+        assert pool.run(directory, 'Main.idr', 'k', type_of('main')) == 'main : Type'
+    finally:
+        pool.close()
+        shutil.rmtree(directory)
+
+
+def test_recycling():
+    directory = make_files(Main='main : IO ()\n')
+    pool = repl_pool.ReplPool(1, args=FAKE_IDRIS, timeout=5, max_uses=2)
+    try:
+        pids = [pool.run(directory, 'Main.idr', 'k', type_of('pid')) for _ in range(5)]
+        assert pids[0] == pids[1] != pids[2] == pids[3] != pids[4]
+        assert len(pool.idle) == 1
+        worker = pool.idle[0]
+        pool.close()
+        assert not pool.idle and not worker.alive() and not os.path.exists(worker.work_dir)
+    finally:
+        pool.close()
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    for name, test in sorted(globals().items()):
+        if name.startswith('test_') and callable(test):
+            test()
+            print("%s passed" % name)
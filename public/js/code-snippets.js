@@ -208,6 +208,23 @@ function playpen_get_lang(playpen) {
         }, 60000).then(response => response.json());
     }
 
+    // Like run_idris_files, for a list of commands on the same files, all run
+    // in one request. Resolves to the list of results, in order.
+    function run_idris_batch(codeFiles, commandDicts) {
+        var data = new FormData();
+        for(const f of codeFiles) {
+            data.append('files[]', f, f.name);
+        }
+
+        data.append("commands", JSON.stringify(commandDicts));
+
+        return fetch_with_timeout("https://us-central1-idrisrunner.cloudfunctions.net/idrisrunner", {
+            method: 'POST',
+            mode: 'cors',
+            body: data
+        }, 60000).then(response => response.json());
+    }
+
 
     function get_idris_token(editor) {
         let sess = editor.getSession();
@@ -366,8 +383,40 @@ function playpen_get_lang(playpen) {
     function idris_typecheck(block, editor = null) {
         let pkg = package_idris_files(block);
         let files = pkg.files;
-        
-        return run_idris_files(files, {action: "check", file: pkg.activeFilename});
+
+        if(files.length <= 1) {
+            return run_idris_files(files, {action: "check", file: pkg.activeFilename});
+        }
+
+        // A page with several files: check all of them in one request, which
+        // loads them in a single Idris session, and refresh the results
+        // already shown under the blocks of the other files
+        let fileNames = files.map(f => f.name);
+        if(!fileNames.includes(pkg.activeFilename)) {
+            fileNames.push(pkg.activeFilename);
+        }
+        let commands = fileNames.map(fileName => ({action: "check", file: fileName}));
+
+        return run_idris_batch(files, commands).then(results => {
+            fileNames.forEach((fileName, i) => {
+                if(fileName != pkg.activeFilename) {
+                    refresh_idris_results(fileName, results[i]);
+                }
+            });
+            return results[fileNames.indexOf(pkg.activeFilename)];
+        });
+    }
+
+    function refresh_idris_results(fileName, result) {
+        let slices = filesToSlices[fileName];
+        for(var sliceProp in slices) {
+            let editor = slices[sliceProp];
+            let code_block = editor.container.parentNode;
+            let result_block = code_block.querySelector(".result");
+            if(result_block && result_block.style.display != 'none') {
+                handle_idris_result(code_block, result_block, editor, result);
+            }
+        }
     }
 
     function idris_typeof(block, editor) {